@@ -0,0 +1,68 @@
+"""
+Throughput benchmark for the console log event engine.
+
+Usage: python -m benchmarks.bench_log_events [--lines N] [--target LINES_PER_SEC]
+Exits non-zero if throughput is below the target (default 100k lines/s).
+"""
+import argparse
+import random
+import sys
+import time
+
+from utils.log_events import LogEventEngine
+
+SAMPLE_LINES = [
+    "[12:34:56] [Server thread/INFO]: Steve joined the game",
+    "[12:34:56] [Server thread/INFO]: Alex left the game",
+    "[12:34:56] [Async Chat Thread - #0/INFO]: <Steve> anyone up for the nether?",
+    "[12:34:56] [Server thread/INFO]: Steve was slain by Zombie",
+    "[12:34:56] [Server thread/WARN]: Can't keep up! Is the server overloaded? Running 2503ms or 50 ticks behind",
+    '[12:34:56] [Server thread/INFO]: Done (12.345s)! For help, type "help"',
+    # Most real output matches nothing
+    "[12:34:56] [Server thread/INFO]: Preparing spawn area: 83%",
+    "[12:34:56] [Server thread/INFO]: Saving chunks for level 'ServerLevel[world]'/minecraft:overworld",
+    "[12:34:56] [Server thread/INFO]: [CoreProtect] Data is now being logged to the database.",
+    "[12:34:56] [Server thread/INFO]: Steve issued server command: /home base",
+    "[12:34:56] [User Authenticator #3/INFO]: UUID of player Steve is 069a79f4-44e9-4726-a5be-fca90e38aaf5",
+    "[12:34:56] [Server thread/INFO]: Steve[/203.0.113.7:53122] logged in with entity id 431 at ([world]12.5, 64.0, -3.2)",
+]
+
+
+def make_lines(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    # Weight towards unmatched lines, like a real console
+    weights = [1, 1, 3, 1, 1, 0.1, 8, 8, 4, 4, 2, 2]
+    return rng.choices(SAMPLE_LINES, weights=weights, k=count)
+
+
+def run(lines: int = 200_000, repeat: int = 3):
+    engine = LogEventEngine()
+    data = make_lines(lines)
+    best = float('inf')
+    events = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        events = len(engine.feed(data))
+        best = min(best, time.perf_counter() - start)
+    return {
+        "lines": lines,
+        "events": events,
+        "seconds": round(best, 4),
+        "lines_per_sec": round(lines / best),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=200_000)
+    parser.add_argument('--target', type=int, default=100_000)
+    args = parser.parse_args()
+
+    result = run(args.lines)
+    print(f"Parsed {result['lines']} lines ({result['events']} events) in {result['seconds']}s: "
+          f"{result['lines_per_sec']:,} lines/s (target {args.target:,})")
+    return 0 if result['lines_per_sec'] >= args.target else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""
+Benchmarks for the Minecraft and voice cogs' hot paths, run offline against
+stubbed Discord objects and the in-process fake Minefort API.
+
+Usage: python -m benchmarks.bench_minecraft [--quick] [--save] [--tolerance 2.0]
+
+Results are compared with benchmarks/baselines/minecraft.json when it exists
+(exit status 1 if any timing regressed by more than the tolerance); --save
+replaces the baseline with this run.
+"""
+import os
+import tempfile
+
+# Keep the cogs' data files out of the real data directory
+os.environ.setdefault('DATA_DIR', tempfile.mkdtemp(prefix='bench-minecraft-'))
+# Stay off the network: no Server List Ping or Query against the real server
+os.environ['SLP_ENABLED'] = 'false'
+os.environ['QUERY_ENABLED'] = 'false'
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+from cogs.minecraft import MinecraftCommands
+from cogs.voice import VoiceChannels
+from tools.fake_minefort import FakeMinefort
+from utils.console_log import ConsoleRingLog
+from utils.minefort_api import MinefortAPI
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines', 'minecraft.json')
+
+LINE = "[12:34:56] [Server thread/INFO]: Saving chunks for level 'ServerLevel[world]'/minecraft:overworld {}"
+
+
+class StubMessage:
+    def __init__(self, message_id, content):
+        self.id = message_id
+        self.content = content
+
+    async def edit(self, content=None, **kwargs):
+        self.content = content
+
+
+class StubChannel:
+    def __init__(self, channel_id, members=()):
+        self.id = channel_id
+        self.members = list(members)
+        self.messages = {}
+
+    async def send(self, content=None, **kwargs):
+        message = StubMessage(len(self.messages) + 1, content)
+        self.messages[message.id] = message
+        return message
+
+    async def fetch_message(self, message_id):
+        return self.messages[message_id]
+
+
+class StubBot:
+    """Just enough of commands.Bot for the cogs' background paths"""
+
+    def __init__(self):
+        self.channels = {}
+
+    def get_channel(self, channel_id):
+        return self.channels.setdefault(channel_id, StubChannel(channel_id))
+
+    def get_cog(self, name):
+        return None
+
+    async def wait_until_ready(self):
+        pass
+
+
+class StubConsoleAPI:
+    """Returns a pre-built sequence of console snapshots"""
+
+    def __init__(self, snapshots):
+        self.snapshots = snapshots
+        self.index = 0
+
+    def get_console_logs(self, server_id):
+        logs = self.snapshots[self.index % len(self.snapshots)]
+        self.index += 1
+        return True, logs
+
+
+def fake_servers(count, state=4):
+    return [
+        {"serverId": f"fake{i:04d}", "serverName": f"Fake Server {i + 1}", "state": state,
+         "playerCount": i % 20, "maxPlayers": 20}
+        for i in range(count)
+    ]
+
+
+async def median_time(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+async def bench_status_render(sizes, repeat):
+    """Time one status_updater pass (render and message edit) per server count"""
+    results = {}
+    for count in sizes:
+        cog = MinecraftCommands(StubBot())
+        cog.servers_cache = fake_servers(count)
+        cog.last_update = float('inf')  # Always fresh; measure rendering, not fetching
+        await cog.status_updater()  # Sends the message; later runs edit it
+        seconds = await median_time(cog.status_updater, repeat)
+        results[str(count)] = {"ms": round(seconds * 1000, 3)}
+    return results
+
+
+async def bench_get_servers(callers_list, rounds, latency):
+    """Concurrent get_servers(force_refresh=True) callers against the fake backend"""
+    fake = FakeMinefort(servers=10, latency=latency, console_interval=0)
+    url = await fake.start()
+    results = {}
+    try:
+        cog = MinecraftCommands(StubBot())
+        cog.api = MinefortAPI("bench@example.com", "bench", base_url=url)
+        await asyncio.to_thread(cog.api.ensure_login)
+        for callers in callers_list:
+            fake.requests = 0
+            start = time.perf_counter()
+            for _ in range(rounds):
+                await asyncio.gather(*(cog.get_servers(force_refresh=True) for _ in range(callers)))
+            elapsed = time.perf_counter() - start
+            results[str(callers)] = {
+                "ms_per_round": round(elapsed / rounds * 1000, 3),
+                "backend_requests_per_round": round(fake.requests / rounds, 2),
+            }
+
+        # Warm-cache lookups never touch the backend
+        calls = 10000
+        start = time.perf_counter()
+        for _ in range(calls):
+            await cog.get_servers()
+        results["cached"] = {"us_per_call": round((time.perf_counter() - start) / calls * 1e6, 3)}
+    finally:
+        await fake.stop()
+    return results
+
+
+def console_snapshots(size_bytes, steps, new_per_step=20):
+    """Sliding windows of roughly size_bytes of console output, each with new lines at the end"""
+    line_size = len(LINE.format(0)) + 2
+    window = max(1, size_bytes // line_size)
+    lines = [LINE.format(i) for i in range(window + steps * new_per_step)]
+    return ["\n".join(lines[i * new_per_step:i * new_per_step + window]) for i in range(steps + 1)]
+
+
+async def bench_console_updater(sizes, repeat):
+    """Time one console_updater pass (diff, event parse, ring log append, render) per log size"""
+    results = {}
+    for label, size in sizes:
+        cog = MinecraftCommands(StubBot())
+        cog.servers_cache = fake_servers(1)
+        cog.last_update = float('inf')
+        cog.api = StubConsoleAPI(console_snapshots(size, repeat))
+        with tempfile.TemporaryDirectory() as tmp:
+            cog.console_log = ConsoleRingLog(os.path.join(tmp, 'console.log'), 50000)
+            await cog.console_updater()  # First snapshot: everything is new
+            seconds = await median_time(cog.console_updater, repeat)
+        results[label] = {"ms": round(seconds * 1000, 3)}
+    return results
+
+
+async def bench_voice_state_update(counts, events):
+    """Time on_voice_state_update for an unrelated join while N temp channels exist"""
+    results = {}
+    member = SimpleNamespace(bot=False, id=1, display_name="bench", guild=SimpleNamespace(id=1, afk_channel=None))
+    other = StubChannel(10**12, members=[member])
+    before, after = SimpleNamespace(channel=None), SimpleNamespace(channel=other)
+    for count in counts:
+        bot = StubBot()
+        cog = VoiceChannels(bot)
+        for i in range(count):
+            channel = StubChannel(i + 1, members=[SimpleNamespace(id=i + 2)])
+            bot.channels[channel.id] = channel
+            cog.temp_channels[channel.id] = i + 2
+        start = time.perf_counter()
+        for _ in range(events):
+            await cog.on_voice_state_update(member, before, after)
+        results[str(count)] = {"us": round((time.perf_counter() - start) / events * 1e6, 3)}
+    return results
+
+
+async def run(quick=False):
+    repeat = 3 if quick else 10
+    return {
+        "status_render": await bench_status_render([1, 10, 100] if quick else [1, 10, 100, 1000], repeat),
+        "get_servers": await bench_get_servers([1, 10, 100] if quick else [1, 10, 100, 1000],
+                                               rounds=3 if quick else 10, latency=0.01),
+        "console_updater": await bench_console_updater(
+            [("1KB", 1 << 10), ("100KB", 100 << 10), ("1MB", 1 << 20)] if quick else
+            [("1KB", 1 << 10), ("10KB", 10 << 10), ("100KB", 100 << 10), ("1MB", 1 << 20), ("10MB", 10 << 20)],
+            repeat),
+        "voice_state_update": await bench_voice_state_update(
+            [0, 10, 100] if quick else [0, 10, 100, 1000, 10000], events=100 if quick else 1000),
+    }
+
+
+# Differences below these are scheduler noise, whatever the ratio
+NOISE_FLOOR = {"ms": 0.5, "us": 20.0}
+
+
+def compare(results, baseline, tolerance):
+    """Return the timings that got slower than baseline * tolerance"""
+    regressions = []
+    for bench, cases in results.items():
+        for case, metrics in cases.items():
+            for metric, value in metrics.items():
+                unit = metric[:2]
+                if unit not in NOISE_FLOOR:
+                    continue
+                old = baseline.get(bench, {}).get(case, {}).get(metric)
+                if old and value > old * tolerance and value - old > NOISE_FLOOR[unit]:
+                    regressions.append(f"{bench}[{case}].{metric}: {old} -> {value} ({value / old:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quick', action='store_true', help="Smaller sizes and fewer repeats")
+    parser.add_argument('--save', action='store_true', help="Write this run as the new baseline")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=2.0, help="Allowed slowdown factor (default 2.0)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.quick))
+    for bench, cases in results.items():
+        print(bench)
+        for case, metrics in cases.items():
+            print(f"  {case:>8}: " + ", ".join(f"{k}={v}" for k, v in metrics.items()))
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump({"python": platform.python_version(), "platform": platform.platform(),
+                       "results": results}, f, indent=2)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    except FileNotFoundError:
+        print("No baseline to compare against (run with --save to create one)")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
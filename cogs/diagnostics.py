@@ -0,0 +1,149 @@
+import discord
+from discord.ext import commands
+import asyncio
+import os
+import time
+from utils.config import config
+from utils.loop_monitor import loop_monitor
+from utils.startup import startup
+from utils.permissions import owner_only
+from utils.runtime_profile import ProfileReport, rss_bytes
+from utils.gateway_stats import gateway_stats
+from utils.responses import response_stats
+
+# Discord rejects embeds whose text adds up to more than this
+EMBED_LIMIT = 6000
+OMITTED_RESERVE = 64
+MIN_STACK_CHARS = 200
+
+
+class Diagnostics(commands.Cog):
+    """Owner-only runtime diagnostics"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.profile_report = ProfileReport(os.path.join(config.data_dir, 'runtime_profile.json'))
+
+    @commands.hybrid_command(name="diag", description="Show event loop diagnostics (owner only)")
+    @owner_only()
+    async def diag(self, ctx):
+        """Shows event loop lag and the slowest recent callbacks"""
+        report = loop_monitor.report()
+        embed = discord.Embed(
+            title="🩺 Bot Diagnostics",
+            color=discord.Color.orange() if report["lag_max_ms"] >= report["threshold_ms"] else discord.Color.green()
+        )
+
+        embed.add_field(
+            name="Event Loop Lag",
+            value=(f"Last: **{report['lag_last_ms']}ms**\n"
+                   f"Average: **{report['lag_avg_ms']}ms**\n"
+                   f"Max: **{report['lag_max_ms']}ms**"),
+            inline=True
+        )
+        embed.add_field(
+            name="Slow Steps",
+            value=(f"Count: **{report['slow_count']}**\n"
+                   f"Threshold: **{report['threshold_ms']}ms**\n"
+                   f"Gateway: **{round(self.bot.latency * 1000)}ms**"),
+            inline=True
+        )
+
+        timings = startup.report()
+        startup_lines = [f"{name}: **{ms}ms**" for name, ms in timings["phases_ms"].items()]
+        startup_lines += [f"{name}: **+{ms}ms**" for name, ms in timings["milestones_ms"].items()]
+        embed.add_field(name="Startup", value="\n".join(startup_lines) or "No data", inline=True)
+
+        gateway = gateway_stats.report()
+        gateway_lines = [
+            f"Mode: **{'slash-only' if config.slash_only else 'prefix + slash'}**",
+            f"Events/s: **{gateway['events_per_sec']}** (last {gateway['window_s']}s)",
+            f"CPU/event: **{gateway['cpu_ms_per_event'] if gateway['cpu_ms_per_event'] is not None else '-'}ms**",
+            f"Total: **{gateway['total']}**",
+        ]
+        gateway_lines += [f"{name}: {count}" for name, count in gateway['top']]
+        embed.add_field(name="Gateway", value="\n".join(gateway_lines), inline=True)
+
+        responses = response_stats.report()
+        embed.add_field(
+            name="Time to First Response",
+            value=(f"p50: **{responses['p50_ms'] if responses['p50_ms'] is not None else '-'}ms**\n"
+                   f"p99: **{responses['p99_ms'] if responses['p99_ms'] is not None else '-'}ms**\n"
+                   f"Samples: **{responses['samples']}**"),
+            inline=True
+        )
+
+        # Current memory, plus the last measurement at ready for each profile
+        memory_lines = [
+            f"Profile: **{config.runtime_profile}**",
+            f"RSS now: **{rss_bytes() / (1024 * 1024):.1f}MB**",
+            f"Members cached: **{sum(len(guild.members) for guild in self.bot.guilds)}**",
+        ]
+        for name, measured in sorted((await asyncio.to_thread(self.profile_report.load)).items()):
+            memory_lines.append(f"{name} at ready: **{measured['rss_mb']}MB**, "
+                                f"{measured['members_cached']} members, {measured['ready_ms']}ms")
+        embed.add_field(name="Memory", value="\n".join(memory_lines), inline=True)
+
+        minecraft = self.bot.get_cog('MinecraftCommands')
+        if minecraft and minecraft.log_events.counts:
+            counts = minecraft.log_events.counts.most_common()
+            embed.add_field(
+                name="Console Events",
+                value="\n".join(f"{name}: **{count}**" for name, count in counts),
+                inline=True
+            )
+
+        if minecraft:
+            breaker = minecraft.breaker.report()
+            breaker_lines = [f"Circuit: **{breaker['state']}**", f"Failures: **{breaker['failures']}**"]
+            if breaker['opened_at']:
+                breaker_lines.append(f"Open since <t:{int(breaker['opened_at'])}:R>, next probe in {breaker['retry_after']}s")
+            if minecraft.stale_since:
+                breaker_lines.append(f"Serving data from <t:{int(minecraft.stale_since)}:R>")
+            embed.add_field(name="Minefort", value="\n".join(breaker_lines), inline=True)
+
+            bus_lines = [f"Published: **{minecraft.event_bus.published}**"]
+            bus_lines += [f"{sub['name']}: {sub['pending']} queued, {sub['dropped']} dropped"
+                          for sub in minecraft.event_bus.stats()]
+            embed.add_field(name="Event Bus", value="\n".join(bus_lines), inline=True)
+
+        voice = self.bot.get_cog('VoiceChannels')
+        if voice:
+            edits = voice.overwrites.report()
+            dms = voice.dm_queue.report()
+            embed.add_field(
+                name="Voice Permissions",
+                value=f"Changes: **{edits['changes']}** in **{edits['edits']}** edits\n"
+                      f"Throttled: **{edits['throttled']}**, pending: **{edits['pending']}**\n"
+                      f"DMs: **{dms['sent']}** sent, {dms['queued']} queued, {dms['failed']} failed",
+                inline=True
+            )
+
+        embed.set_footer(text=f"Monitor running: {'yes' if loop_monitor.installed else 'no'} | {time.strftime('%Y-%m-%d %H:%M:%S')}")
+
+        offenders = loop_monitor.worst_offenders()[:5]
+        if not offenders:
+            embed.add_field(name="Worst Offenders", value="None recorded 🎉", inline=False)
+        for index, record in enumerate(offenders):
+            name = f"{record.duration * 1000:.0f}ms - {record.name}"[:256]
+            header = f"<t:{int(record.timestamp)}:R>\n```\n"
+            # Share what's left of Discord's 6000 char embed total between the remaining
+            # offenders, keeping each field under 1024 and room for the "not shown" note
+            budget = (EMBED_LIMIT - OMITTED_RESERVE - len(embed)) // (len(offenders) - index)
+            room = min(1024, budget - len(name)) - len(header) - len("\n```")
+            if room < MIN_STACK_CHARS:
+                embed.add_field(
+                    name="Worst Offenders",
+                    value=f"{len(offenders) - index} more not shown (embed size limit)",
+                    inline=False
+                )
+                break
+            # Keep only the innermost frames
+            stack_tail = "\n".join(record.stack.strip().splitlines()[-6:]) or "No stack captured"
+            embed.add_field(name=name, value=f"{header}{stack_tail[-room:]}\n```", inline=False)
+
+        await ctx.send(embed=embed, ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Diagnostics(bot))
@@ -70,7 +70,8 @@ class General(commands.Cog):
         minecraft_commands = (
             "`/serverstatus` - Check the Minecraft server status\n"
             "`/serverip` - Get the Minecraft server IP address\n"
-            "`/playerlist` - See which players are online\n")
+            "`/playerlist` - See which players are online\n"
+            "`/boottimes` - See how long recent server boots took\n")
 
         public_server_commands = (
             "`/startserver` - Start the Minecraft server (🔹 commands channel only)\n"
@@ -85,7 +86,9 @@ class General(commands.Cog):
         voice_commands = (
             "`/lock` - Lock your voice channel to prevent others from joining\n"
             "`/unlock` - Unlock your voice channel to allow everyone to join\n"
-            "`/invite @user` - Invite a specific user to your locked voice channel\n"
+            "`/invite @user ...` - Invite up to 8 members to your locked voice channel\n"
+            "`/voicetop` - See who has spent the most time in voice\n"
+            "`/voicestats` - Voice activity for the server or a member\n"
         )
 
         general_commands = ("`/ping` - Check bot latency\n"
@@ -110,7 +113,9 @@ class General(commands.Cog):
 
         embed.add_field(
             name="📟 Console Channel",
-            value="**Owner Only**: Send commands directly to the server console in the console channel",
+            value=("**Owner Only**: Send commands directly to the server console in the console channel "
+                   "(one command per line)\n"
+                   "`/console search <regex>` - Search the saved console log"),
             inline=False
         )
 
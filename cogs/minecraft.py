@@ -1,67 +1,428 @@
 import discord
 from discord.ext import commands, tasks
 from utils.config import config
-from utils.minefort_api import MinefortAPI
+from utils.startup import startup
+from utils.permissions import access, in_channel, staff_only, owner_only
+from utils.console_queue import ConsoleCommandQueue
+from utils.console_log import ConsoleRingLog, new_lines, chunk_lines
+from utils.log_events import LogEventEngine, PlayerJoin, PlayerLeave, ServerCrash, ServerDone
+from utils.boot_history import BootHistory
+from utils.idle_policy import IdlePolicy, AuditLog
+from utils.rate_limit import RateLimiter
+from utils.event_bus import EventBus, ServerSnapshot, StateChanged
+from utils.circuit_breaker import CircuitBreaker
+from utils.responses import run_with_deadline
+from utils.status_feed import status_feed
+from utils.slp import SLPClient
+from utils.query import QueryClient
 import asyncio
+import importlib
+import os
+import re
+from collections import deque
 from typing import Optional
 import time
 
+# The single periodic Minefort poll; on-demand callers reuse its snapshot
+SNAPSHOT_INTERVAL = 60
+CACHE_TTL = SNAPSHOT_INTERVAL * 1.5
+STATUS_MAX_AGE = 15  # /serverstatus answers from the cache if it is at most this old
+
+# Readiness detection after /startserver and /wakeserver (the poller speeds up meanwhile)
+BOOT_POLL_INTERVAL = 3
+BOOT_TIMEOUT = 600
+
+# Streaming console mirror limits
+STREAM_MESSAGES_PER_FLUSH = 3
+STREAM_BACKLOG_LINES = 5000
+
+STATE_NAMES = {0: "HIBERNATING", 1: "PROCESSING", 3: "STARTING", 4: "RUNNING", 5: "OFFLINE", 8: "STOPPING"}
+
+
+class WakeServerView(discord.ui.View):
+    """Button that wakes a hibernating server straight from a status reply"""
+    
+    def __init__(self, cog, server_id, server_name):
+        super().__init__(timeout=900)
+        self.cog = cog
+        self.server_id = server_id
+        self.server_name = server_name
+        self.message = None
+    
+    @discord.ui.button(label="Wake server", emoji="⏰", style=discord.ButtonStyle.success)
+    async def wake(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Wake the server, deduplicated and rate-limited"""
+        cog = self.cog
+        retry_after = max(
+            cog.wake_user_limiter.retry_after(interaction.user.id),
+            cog.wake_guild_limiter.retry_after(interaction.guild_id)
+        )
+        if retry_after:
+            await interaction.response.send_message(f"⏳ Please wait {retry_after:.0f}s before trying again.", ephemeral=True)
+            return
+        
+        # Someone else already clicked (here or on another message)
+        if (self.server_id, 'wakeup') in cog.pending_actions or cog.server_states.get(self.server_id) in (1, 3, 4):
+            await interaction.response.send_message("🔄 The server is already waking up.", ephemeral=True)
+            return
+        
+        cog.wake_user_limiter.hit(interaction.user.id)
+        cog.wake_guild_limiter.hit(interaction.guild_id)
+        await interaction.response.defer()
+        
+        success, message = await cog.run_server_action(self.server_id, 'wakeup')
+        if not success:
+            await interaction.followup.send(f"❌ Failed to wake up server: {message}", ephemeral=True)
+            return
+        
+        await self.show_state(1)
+        await interaction.followup.send(f"✅ {interaction.user.mention} is waking up **{self.server_name}**!")
+        cog.start_boot_watch(self.server_id, self.server_name, interaction.channel, interaction.user)
+    
+    async def show_state(self, state):
+        """Reflect the server's current state on the button"""
+        button = self.wake
+        if state == 0:
+            button.disabled = False
+            button.label = "Wake server"
+        elif state == 4:
+            button.disabled = True
+            button.label = "Server is running"
+            button.style = discord.ButtonStyle.secondary
+            self.stop()
+            self.cog.untrack_wake_view(self)
+        else:
+            button.disabled = True
+            button.label = f"{STATE_NAMES.get(state, 'Waking up').capitalize()}…"
+        
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+    
+    async def on_timeout(self):
+        self.wake.disabled = True
+        self.cog.untrack_wake_view(self)
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+
 class MinecraftCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.api = MinefortAPI(config.minefort_email, config.minefort_password)
+        self.api = None  # Created in cog_load
         self.servers_cache = []
         self.last_update = 0
         self.last_status_message_id = None
         self.last_console_message_id = None
         self.last_console_content = ""
+        self._refresh_task = None
+        self.console_queue = None  # Created in cog_load
+        self.console_log = None  # Created in cog_load
+        self.console_tail = []  # Last lines seen, used to find new output
+        self.console_stream_buffer = deque()
+        self.console_stream_dropped = 0
+        
+        # Typed events parsed from new console lines
+        self.log_events = LogEventEngine()
+        self.online_players = set()  # Names seen joining in the first server's console, /playerlist fallback
+        self.log_events.subscribe(PlayerJoin, lambda event: self.online_players.add(event.player))
+        self.log_events.subscribe(PlayerLeave, lambda event: self.online_players.discard(event.player))
+        self.log_events.subscribe(ServerDone, lambda event: self.online_players.clear())
+        self.log_events.subscribe(ServerCrash, self.on_server_crash)
+        
+        # Boot readiness watch
+        self.boot_watch = None
+        self.boot_history = BootHistory(os.path.join(config.data_dir, 'boot_history.json'))
+        
+        # Auto-hibernate when nobody is playing
+        self.idle_policy = IdlePolicy(config.idle_empty_samples, config.idle_grace_seconds,
+                                      sample_interval=SNAPSHOT_INTERVAL)
+        self.idle_audit = AuditLog(os.path.join(config.data_dir, 'idle_audit.jsonl'))
+        
+        # Shared in-flight power actions and wake buttons
+        self.pending_actions = {}  # (serverId, action) -> future
+        self.server_states = {}  # serverId -> last seen state
+        self.wake_views = {}  # serverId -> set of WakeServerView
+        self.wake_user_limiter = RateLimiter(1, 30)
+        self.wake_guild_limiter = RateLimiter(3, 60)
+        self._background_tasks = set()
+        
+        # Server snapshots from the poller, fanned out to subscribers
+        self.event_bus = EventBus()
+        self._consumers = []
+        
+        # Degraded mode while Minefort is unreachable
+        self.breaker = CircuitBreaker('minefort', failure_threshold=config.minefort_failure_threshold)
+        self.last_success = None  # time.time() of the last successful fetch
+        self.stale_since = None  # Set while serving the last known data
+        
+        # Live player counts and roster straight from the Minecraft server
+        self.slp = None  # Created on first use, and again if the address changes
+        self.query = None  # Same, for the UDP Query client
+    
+    async def cog_load(self):
+        """Create the API client and start background tasks"""
+        # Importing requests is slow, so do it off the event loop while other cogs load
+        minefort_api = await asyncio.to_thread(importlib.import_module, 'utils.minefort_api')
+        self.api = minefort_api.MinefortAPI(config.minefort_email, config.minefort_password,
+                                            base_url=config.minefort_api_url, timeout=config.minefort_timeout)
+        self.console_queue = ConsoleCommandQueue(
+            self.send_console_command,
+            self.console_updater,
+            concurrency=config.console_command_concurrency
+        )
+        self.console_log = await asyncio.to_thread(
+            ConsoleRingLog,
+            os.path.join(config.data_dir, 'console.log'),
+            config.console_log_max_lines
+        )
+        self.console_tail = self.console_log.tail(5)
+        
+        # Subscribers to the snapshot poller
+        self.start_consumer('status', self.on_snapshot_status, ServerSnapshot, maxsize=1)
+        self.start_consumer('idle', self.on_snapshot_idle, ServerSnapshot, maxsize=4)
+        self.start_consumer('wake_views', self.on_state_change, StateChanged, maxsize=32)
+        self.start_consumer('web_api', self.on_snapshot_web, ServerSnapshot, maxsize=1)
         
         # Start background tasks
-        self.status_updater.start()
+        self.snapshot_poller.start()
         self.console_updater.start()
+        self.console_stream_flusher.start()
     
     def cog_unload(self):
         """Cleanup when cog is unloaded"""
-        self.status_updater.cancel()
+        self.snapshot_poller.cancel()
         self.console_updater.cancel()
+        for task in self._consumers:
+            task.cancel()
+        self.console_stream_flusher.cancel()
+        if self.boot_watch:
+            self.boot_watch.cancel()
+        if self.console_queue:
+            self.console_queue.stop()
     
     async def get_servers(self, force_refresh=False):
         """Get servers with caching to avoid repeated API calls"""
         current_time = asyncio.get_event_loop().time()
         
-        # Refresh cache if it's empty, forced, or older than 30 seconds
-        if not self.servers_cache or force_refresh or (current_time - self.last_update) > 30:
-            loop = asyncio.get_event_loop()
-            try:
-                self.servers_cache = await loop.run_in_executor(None, self.api.get_servers)
-                self.last_update = current_time
-            except Exception as e:
-                print(f"❌ Error refreshing servers cache: {e}")
+        # Refresh cache if it's empty, forced, or older than the poller keeps it
+        if not self.servers_cache or force_refresh or (current_time - self.last_update) > CACHE_TTL:
+            # Share one in-flight request between concurrent callers (e.g. the startup prefetch)
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.ensure_future(self._refresh_servers())
+            await asyncio.shield(self._refresh_task)
                 
         return self.servers_cache
     
+    async def _refresh_servers(self):
+        """Fetch the server list from Minefort into the cache and publish it"""
+        # While the circuit is open, callers get the last known data straight away
+        if not self.breaker.allow():
+            return
+        
+        loop = asyncio.get_event_loop()
+        try:
+            servers = await loop.run_in_executor(None, self.api.fetch_servers)
+        except Exception as e:
+            self.breaker.record_failure()
+            if self.stale_since is None:
+                self.stale_since = self.last_success or time.time()
+                print(f"❌ Error refreshing servers cache: {e}")
+            return
+        
+        self.breaker.record_success()
+        servers = await self.merge_query(servers)
+        self.servers_cache = servers
+        self.last_update = loop.time()
+        self.last_success = time.time()
+        self.stale_since = None
+        self.event_bus.publish(ServerSnapshot(tuple(servers), self.last_success))
+        self.track_state_changes(servers)
+    
+    def stale_note(self):
+        """Marker for replies served from old data while Minefort is unreachable"""
+        if self.stale_since is None:
+            return ""
+        return f"⚠️ Minefort is unreachable, showing data from <t:{int(self.stale_since)}:R>."
+    
+    async def servers_for_reply(self, ctx, max_age=CACHE_TTL):
+        """
+        Servers for a command reply, plus a note to show with them.
+        
+        Fresh cached data is returned without deferring; otherwise Minefort is
+        asked under the response deadline, falling back to the last known data.
+        """
+        age = asyncio.get_event_loop().time() - self.last_update
+        if not self.servers_cache or age > max_age:
+            done, _ = await run_with_deadline(ctx, self.get_servers(force_refresh=True), config.response_deadline)
+            if not done:
+                since = f", showing data from <t:{int(self.last_success)}:R>" if self.last_success else ""
+                return self.servers_cache, f"⏳ Minefort is slow to respond{since}."
+        return self.servers_cache, self.stale_note()
+    
+    def track_state_changes(self, servers):
+        """Compare fresh states with the last seen ones and publish transitions"""
+        for server in servers:
+            server_id = server.get('serverId')
+            state = server.get('state')
+            old_state = self.server_states.get(server_id)
+            self.server_states[server_id] = state
+            if old_state is not None and old_state != state:
+                self.event_bus.publish(StateChanged(server, old_state, state))
+    
+    def start_consumer(self, name, handler, *event_types, maxsize=16):
+        """Subscribe handler(event) to bus events, run in its own task once the bot is ready"""
+        subscription = self.event_bus.subscribe(name, *event_types, maxsize=maxsize)
+        self._consumers.append(asyncio.create_task(self._consume(subscription, handler)))
+    
+    async def _consume(self, subscription, handler):
+        await self.bot.wait_until_ready()
+        while True:
+            event = await subscription.get()
+            try:
+                await handler(event)
+            except Exception as e:
+                print(f"❌ Error in {subscription.name} subscriber: {e}")
+    
+    async def on_state_change(self, event):
+        """Update live wake buttons for a server whose state changed"""
+        for client in (self.slp, self.query):
+            if client:
+                client.invalidate()
+        for view in list(self.wake_views.get(event.server_id, ())):
+            await view.show_state(event.new)
+    
+    async def live_players(self, server):
+        """
+        Server List Ping result for a running server, or None to use Minefort's counts.
+        
+        config.server_ip points at the first server, so only that one is pinged.
+        """
+        if not config.slp_enabled or server.get('state') != 4:
+            return None
+        if not self.servers_cache or self.servers_cache[0].get('serverId') != server.get('serverId'):
+            return None
+        address = config.slp_address or config.server_ip
+        if self.slp is None or self.slp.address != address:
+            self.slp = SLPClient(address)
+        return await self.slp.status()
+    
+    async def merge_query(self, servers):
+        """Add the Query roster and details to the first server while it is running"""
+        if not config.query_enabled or not servers or servers[0].get('state') != 4:
+            return servers
+        address = config.query_address or config.server_ip
+        if self.query is None or self.query.address != address:
+            self.query = QueryClient(address)
+        stat = await self.query.full_stat()
+        if stat is None:
+            return servers
+        # Copy: the API client keeps the list it returned for ETag revalidation
+        first = dict(servers[0], players=list(stat.players), query=stat.to_dict())
+        return [first] + list(servers[1:])
+    
+    def spawn(self, coro):
+        """Run a coroutine in the background, keeping a reference until it finishes"""
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+    
+    async def run_server_action(self, server_id, action):
+        """Perform a power action, sharing one in-flight request per server and action"""
+        if self.breaker.is_open():
+            return False, f"Minefort is unreachable right now, retrying in {self.breaker.retry_after():.0f}s"
+        
+        key = (server_id, action)
+        future = self.pending_actions.get(key)
+        if future is None:
+            loop = asyncio.get_event_loop()
+            future = loop.run_in_executor(
+                None, lambda: self.api.perform_server_action(server_id, action)
+            )
+            self.pending_actions[key] = future
+            future.add_done_callback(lambda _: self.pending_actions.pop(key, None))
+        return await asyncio.shield(future)
+    
+    def make_wake_view(self, servers):
+        """Return a wake button view for the first hibernating server, if any"""
+        server = next((s for s in servers if s.get('state') == 0), None)
+        if not server:
+            return None
+        view = WakeServerView(self, server.get('serverId'), server.get('serverName', 'Unknown Server'))
+        self.wake_views.setdefault(view.server_id, set()).add(view)
+        return view
+    
+    def untrack_wake_view(self, view):
+        views = self.wake_views.get(view.server_id)
+        if views:
+            views.discard(view)
+    
+    async def prefetch(self):
+        """Log in to Minefort and warm the server cache while Discord is still connecting"""
+        with startup.phase('minefort_prefetch'):
+            await self.get_servers(force_refresh=True)
+    
     def has_admin_role(self, member):
         """Check if member has admin or moderator role"""
-        admin_role = discord.utils.get(member.roles, id=config.admin_role_id)
-        mod_role = discord.utils.get(member.roles, id=config.mod_role_id)
-        return admin_role is not None or mod_role is not None
+        return access.is_staff(member)
     
     def is_owner(self, user):
         """Check if user is the bot owner"""
-        return user.id == config.owner_id
+        return access.is_owner(user)
     
-    @tasks.loop(minutes=1)  # Every 1 minute
-    async def status_updater(self):
-        """Update server status message every minute"""
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        """Drop cached permission decisions when a member's roles change"""
+        if before.roles != after.roles:
+            access.invalidate(after.guild.id, after.id)
+    
+    @tasks.loop(seconds=SNAPSHOT_INTERVAL)
+    async def snapshot_poller(self):
+        """Poll Minefort; the refresh publishes the snapshot to every subscriber"""
+        # The first run can use the cache warmed (and published) by the startup prefetch
+        await self.get_servers(force_refresh=self.snapshot_poller.current_loop > 0)
+        
+        # Minefort is down: subscribers get the last known data, marked stale
+        if self.stale_since is not None:
+            self.event_bus.publish(ServerSnapshot(tuple(self.servers_cache), self.stale_since, stale=True))
+    
+    async def on_snapshot_web(self, snapshot):
+        """Web API subscriber: the webserver reads the feed from its own threads"""
+        status_feed.update(snapshot.servers, snapshot.fetched_at, stale=snapshot.stale)
+    
+    async def on_snapshot_idle(self, snapshot):
+        """Auto-hibernate subscriber; a stale snapshot says nothing about who is playing now"""
+        if not snapshot.stale:
+            await self.check_idle(snapshot.servers)
+    
+    async def on_snapshot_status(self, snapshot):
+        """Status message subscriber"""
+        await self.status_updater(list(snapshot.servers), stale_since=snapshot.fetched_at if snapshot.stale else None)
+    
+    async def status_updater(self, servers=None, stale_since=None):
+        """Render the status message for a snapshot (the latest one by default)"""
         try:
-            servers = await self.get_servers(force_refresh=True)
+            if servers is None:
+                servers = self.servers_cache
             
-            if not servers:
+            if not servers and stale_since is None:
                 return
-                
+            
             # Format status message
             status_lines = ["# 🖥️ Fck Society Server Status", ""]
             
+            # Outage banner instead of going quiet while Minefort is down
+            if stale_since is not None:
+                status_lines.append(f"> ⚠️ **Minefort is unreachable.** Last known status from <t:{int(stale_since)}:R>; "
+                                    f"retrying automatically.")
+                status_lines.append("")
+            
             for server in servers:
                 status_text = "UNKNOWN"
                 emoji = "❓"
@@ -85,8 +446,9 @@ class MinecraftCommands(commands.Cog):
                 # Add player count if server is running
                 player_info = ""
                 if server.get('state') == 4:  # Running
-                    player_count = server.get('playerCount', 0)
-                    max_players = server.get('maxPlayers', 0)
+                    live = await self.live_players(server)
+                    player_count = live.online if live else server.get('playerCount', 0)
+                    max_players = live.max_players if live else server.get('maxPlayers', 0)
                     player_info = f" | Players: {player_count}/{max_players}"
                 
                 status_lines.append(f"{emoji} **{server.get('serverName')}**: {status_text}{player_info}")
@@ -109,6 +471,7 @@ class MinecraftCommands(commands.Cog):
                     message = await channel.fetch_message(self.last_status_message_id)
                     await message.edit(content=status_message)
                     message_updated = True
+                    startup.mark('first_status')
                 except discord.NotFound:
                     self.last_status_message_id = None
                 except Exception:
@@ -119,6 +482,7 @@ class MinecraftCommands(commands.Cog):
                 try:
                     message = await channel.send(status_message)
                     self.last_status_message_id = message.id
+                    startup.mark('first_status')
                 except Exception:
                     pass
             
@@ -129,7 +493,8 @@ class MinecraftCommands(commands.Cog):
     async def console_updater(self):
         """Update console logs every 30 seconds"""
         try:
-            servers = await self.get_servers()
+            # State comes from the poller's snapshot; only the console is fetched here
+            servers = self.servers_cache
             if not servers:
                 return
             
@@ -138,8 +503,8 @@ class MinecraftCommands(commands.Cog):
             if not server_id:
                 return
             
-            # Only update console if server is running
-            if servers[0].get('state') != 4:  # Not running
+            # Only update console if server is running (and Minefort is reachable)
+            if servers[0].get('state') != 4 or self.breaker.is_open():
                 return
             
             # Get console logs
@@ -157,14 +522,20 @@ class MinecraftCommands(commands.Cog):
                 
             self.last_console_content = logs
             
+            log_lines = logs.split('\n') if isinstance(logs, str) and logs else []
+            if log_lines and not log_lines[-1]:
+                log_lines.pop()
+            await self.record_console_lines(log_lines)
+            
+            # In streaming mode the flusher posts new lines as separate messages
+            if config.console_stream:
+                return
+            
             # Format console message
             console_lines = ["# 📟 Server Console", "```"]
             
             # Limit logs to last 20 lines to avoid message size limits
-            if isinstance(logs, str):
-                log_lines = logs.split('\n')[-20:] if logs else ["No recent logs available"]
-            else:
-                log_lines = ["No recent logs available"]
+            log_lines = log_lines[-20:] or ["No recent logs available"]
                 
             console_lines.extend(log_lines)
             console_lines.append("```")
@@ -192,8 +563,176 @@ class MinecraftCommands(commands.Cog):
         except Exception:
             pass  # Silent fail
     
-    @status_updater.before_loop
-    async def before_status_updater(self):
+    async def record_console_lines(self, log_lines):
+        """Append output we haven't seen yet to the ring log (and the stream buffer)"""
+        fresh = new_lines(self.console_tail, log_lines)
+        if not fresh:
+            return []
+        self.console_tail = log_lines[-5:]
+        self.log_events.feed(fresh)
+        await asyncio.to_thread(self.console_log.append, fresh)
+        
+        if config.console_stream:
+            self.console_stream_buffer.extend(fresh)
+            # Keep the backlog bounded; skipped lines are still in the ring log
+            overflow = len(self.console_stream_buffer) - STREAM_BACKLOG_LINES
+            for _ in range(max(0, overflow)):
+                self.console_stream_buffer.popleft()
+            self.console_stream_dropped += max(0, overflow)
+        return fresh
+    
+    async def on_server_crash(self, event):
+        """Alert staff in the cPanel channel when the console reports a crash"""
+        channel = self.bot.get_channel(config.cpanel_channel_id)
+        if channel:
+            await channel.send(f"🚨 **Server crash detected in console:**\n```\n{event.line[:1800]}\n```")
+    
+    def start_boot_watch(self, server_id, server_name, channel, requester):
+        """Watch a starting server and announce as soon as it is up"""
+        if self.boot_watch and not self.boot_watch.done():
+            return
+        self.boot_watch = asyncio.create_task(
+            self.watch_boot(server_id, server_name, channel, requester)
+        )
+    
+    async def watch_boot(self, server_id, server_name, channel, requester):
+        """Follow snapshots (polled faster meanwhile) and the console until the server is ready"""
+        loop = asyncio.get_event_loop()
+        started_at = time.time()
+        started = loop.time()
+        reported = {}
+        
+        # ServerDone console events land in the same queue as the snapshots
+        subscription = self.event_bus.subscribe('boot_watch', ServerSnapshot, maxsize=8)
+        on_done = subscription.put
+        self.log_events.subscribe(ServerDone, on_done)
+        self.snapshot_poller.change_interval(seconds=BOOT_POLL_INTERVAL)
+        try:
+            source = None
+            while source is None:
+                remaining = BOOT_TIMEOUT - (loop.time() - started)
+                if remaining <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                
+                if isinstance(event, ServerDone):
+                    reported['seconds'] = event.seconds
+                    source = "console"
+                    continue
+                
+                # Replayed last known data during an outage; wait for a real poll
+                if event.stale:
+                    continue
+                
+                server = event.get(server_id)
+                state = server.get('state') if server else None
+                if state == 4:  # RUNNING
+                    source = "state"
+                
+                # While starting, the "Done (Xs)!" line usually shows up before the state flips
+                elif state == 3:
+                    success, logs = await loop.run_in_executor(
+                        None, lambda: self.api.get_console_logs(server_id)
+                    )
+                    if success and isinstance(logs, str):
+                        lines = logs.split('\n')
+                        if lines and not lines[-1]:
+                            lines.pop()
+                        await self.record_console_lines(lines)
+            
+            if source is None:
+                await channel.send(f"⚠️ **{server_name}** still isn't up after {BOOT_TIMEOUT // 60} minutes. Check the console.")
+                return
+            
+            seconds = loop.time() - started
+            await asyncio.to_thread(self.boot_history.append, {
+                "server_id": server_id,
+                "started_at": int(started_at),
+                "seconds": round(seconds, 1),
+                "reported_seconds": reported.get('seconds'),
+                "source": source,
+            })
+            
+            details = f" (server reported {reported['seconds']:.1f}s)" if 'seconds' in reported else ""
+            await channel.send(f"{requester.mention} ✅ **{server_name}** is up! Boot took **{seconds:.1f}s**{details}")
+            if source == "console":
+                await self.get_servers(force_refresh=True)  # Let subscribers see the new state
+        except Exception as e:
+            print(f"❌ Error watching server boot: {e}")
+        finally:
+            self.log_events.unsubscribe(ServerDone, on_done)
+            self.event_bus.unsubscribe(subscription)
+            self.snapshot_poller.change_interval(seconds=SNAPSHOT_INTERVAL)
+    
+    @tasks.loop(seconds=5)
+    async def console_stream_flusher(self):
+        """Post buffered console lines as new messages, a few per tick to respect rate limits"""
+        if not config.console_stream or not self.console_stream_buffer:
+            return
+        
+        channel = self.bot.get_channel(config.console_channel_id)
+        if not channel:
+            return
+        
+        try:
+            if self.console_stream_dropped:
+                dropped, self.console_stream_dropped = self.console_stream_dropped, 0
+                await channel.send(f"_… {dropped} lines skipped, use `/console search` to find them_")
+            
+            chunks = chunk_lines(self.console_stream_buffer)[:STREAM_MESSAGES_PER_FLUSH]
+            for chunk in chunks:
+                await channel.send(chunk)
+                # Each chunk is "```\n" + lines + "\n```", so it holds (newlines - 1) lines
+                for _ in range(chunk.count('\n') - 1):
+                    self.console_stream_buffer.popleft()
+        except Exception as e:
+            print(f"❌ Error streaming console output: {e}")
+    
+    async def check_idle(self, servers):
+        """Feed the status snapshot to the idle policy and hibernate idle servers"""
+        if not config.auto_hibernate:
+            return
+        
+        # Pick up config changes without a restart
+        self.idle_policy.empty_samples = config.idle_empty_samples
+        self.idle_policy.grace_seconds = config.idle_grace_seconds
+        
+        now = time.time()
+        for server in servers:
+            idle = self.idle_policy.observe(server, now)
+            if idle is not None:
+                await self.auto_hibernate(server, idle)
+    
+    async def auto_hibernate(self, server, idle_seconds):
+        """Hibernate an idle server, announce it and record it in the audit log"""
+        server_id = server.get('serverId')
+        server_name = server.get('serverName', 'Unknown Server')
+        
+        success, message = await self.run_server_action(server_id, 'sleep')
+        
+        idle_minutes = round(idle_seconds / 60)
+        await asyncio.to_thread(self.idle_audit.append, {
+            "time": int(time.time()),
+            "server_id": server_id,
+            "server_name": server_name,
+            "action": "sleep",
+            "reason": f"no players for {int(idle_seconds)}s",
+            "success": success,
+            "message": message,
+        })
+        
+        channel = self.bot.get_channel(config.cpanel_channel_id)
+        if channel:
+            if success:
+                await channel.send(f"💤 Auto-hibernating **{server_name}**: no players online for about {idle_minutes} minutes.")
+            else:
+                await channel.send(f"❌ Auto-hibernate of **{server_name}** failed: {message}")
+    
+    @snapshot_poller.before_loop
+    async def before_snapshot_poller(self):
         """Wait until the bot is ready before starting the task"""
         await self.bot.wait_until_ready()
     
@@ -202,6 +741,11 @@ class MinecraftCommands(commands.Cog):
         """Wait until the bot is ready before starting the task"""
         await self.bot.wait_until_ready()
     
+    @console_stream_flusher.before_loop
+    async def before_console_stream_flusher(self):
+        """Wait until the bot is ready before starting the task"""
+        await self.bot.wait_until_ready()
+    
     @commands.Cog.listener()
     async def on_message(self, message):
         """Handle console commands sent in the console channel"""
@@ -210,7 +754,7 @@ class MinecraftCommands(commands.Cog):
             return
         
         # Only process messages in the console channel
-        if message.channel.id != config.console_channel_id:
+        if not access.in_channel(message.channel.id, 'console'):
             return
         
         # Only allow owner to send commands
@@ -219,9 +763,9 @@ class MinecraftCommands(commands.Cog):
             await message.delete(delay=5)
             return
         
-        # Get the command from the message
-        command = message.content.strip()
-        if not command:
+        # One command per line, so a pasted block is sent as a single batch
+        console_commands = [line.strip() for line in message.content.splitlines() if line.strip()]
+        if not console_commands:
             return
         
         # Get server info
@@ -235,26 +779,64 @@ class MinecraftCommands(commands.Cog):
             await message.reply("❌ Server is not running. Console commands are only available when the server is online.", delete_after=10)
             return
         
-        # Send the command
+        # Queue the batch; the console refresh runs once after the whole batch
+        results = await self.console_queue.submit(server_id, console_commands)
+        failures = [(command, response) for command, success, response in results if not success]
+        
+        if not failures:
+            await message.add_reaction("✅")
+        else:
+            if len(failures) < len(results):
+                await message.add_reaction("⚠️")
+            failure_lines = "\n".join(f"`{command}`: {response}" for command, response in failures[:10])
+            await message.reply(f"❌ Failed to send {len(failures)}/{len(results)} command(s):\n{failure_lines}"[:2000], delete_after=10)
+    
+    async def send_console_command(self, server_id, command):
+        """Send a single console command without blocking the event loop"""
         loop = asyncio.get_event_loop()
-        success, response = await loop.run_in_executor(
+        return await loop.run_in_executor(
             None, lambda: self.api.send_console_command(server_id, command)
         )
+    
+    @commands.hybrid_group(name="console", description="Server console tools (owner only)")
+    @owner_only()
+    async def console(self, ctx):
+        """Server console tools"""
+        await ctx.send("Use `/console search <regex>` to search the console log.", ephemeral=True)
+    
+    @console.command(name="search", description="Search the saved console log with a regex (owner only)")
+    @owner_only()
+    async def console_search(self, ctx, *, pattern: str):
+        """Searches the local console log without refetching from Minefort"""
+        try:
+            regex = re.compile(pattern, re.IGNORECASE)
+        except re.error as e:
+            await ctx.send(f"❌ Invalid regex: {e}", ephemeral=True)
+            return
         
-        if success:
-            await message.add_reaction("✅")
-            # Force update console logs after command
-            await asyncio.sleep(2)
-            await self.console_updater()
-        else:
-            await message.reply(f"❌ Failed to send command: {response}", delete_after=10)
+        matches, total = await asyncio.to_thread(self.console_log.search, regex)
+        if not matches:
+            await ctx.send(f"No console lines match `{pattern}`.", ephemeral=True)
+            return
+        
+        # Show as many of the newest matches as fit in one message
+        header = f"**{total}** match(es) for `{pattern}`"
+        if total > len(matches):
+            header += f" (showing newest {len(matches)})"
+        body = []
+        budget = 2000 - len(header) - 10
+        for line_number, line in reversed(matches):
+            entry = f"{line_number}: {line}".replace("```", "`\u200b``")[:300]
+            if budget - len(entry) - 1 < 0:
+                break
+            body.insert(0, entry)
+            budget -= len(entry) + 1
+        await ctx.send(header + "\n```\n" + "\n".join(body) + "\n```", ephemeral=True)
     
     @commands.hybrid_command(name="serverstatus", description="Check the Minecraft server status")
     async def server_status(self, ctx):
         """Shows the current server status"""
-        await ctx.defer()
-        
-        servers = await self.get_servers(force_refresh=True)
+        servers, note = await self.servers_for_reply(ctx, max_age=STATUS_MAX_AGE)
         
         if not servers:
             await ctx.send("❌ Failed to fetch server status. Please try again later.")
@@ -262,9 +844,11 @@ class MinecraftCommands(commands.Cog):
             
         embed = discord.Embed(
             title="Fck Society Server Status",
-            color=discord.Color.blue(),
+            color=discord.Color.orange() if note else discord.Color.blue(),
             description=f"**IP Address**: `{config.server_ip}`"
         )
+        if note:
+            embed.description += f"\n{note}"
         
         for server in servers:
             status_text = "UNKNOWN"
@@ -292,6 +876,11 @@ class MinecraftCommands(commands.Cog):
                 player_count = server.get('playerCount', 0)
                 max_players = server.get('maxPlayers', 0)
                 player_info = f"\nPlayers: {player_count}/{max_players}"
+                details = server.get('query')
+                if details:
+                    player_info += f"\nMap: {details['map']} | {details['software'] or details['version']}"
+                    if details['plugins']:
+                        player_info += f" | {len(details['plugins'])} plugins"
             
             embed.add_field(
                 name=f"{status_emoji} {server.get('serverName', 'Unknown Server')}",
@@ -300,6 +889,34 @@ class MinecraftCommands(commands.Cog):
             )
         
         embed.set_footer(text=f"Last Updated: {discord.utils.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC")
+        view = self.make_wake_view(servers)
+        message = await ctx.send(embed=embed, view=view)
+        if view:
+            view.message = message
+    
+    @commands.hybrid_command(name="boottimes", description="Show recent server boot times")
+    async def boot_times(self, ctx):
+        """Shows how long recent server boots took"""
+        entries = await asyncio.to_thread(self.boot_history.load)
+        if not entries:
+            await ctx.send("No boots have been recorded yet.")
+            return
+        
+        summary = BootHistory.summarize(entries)
+        embed = discord.Embed(title="⏱️ Server Boot Times", color=discord.Color.blue())
+        
+        recent = "\n".join(
+            f"<t:{entry['started_at']}:f> - **{entry['seconds']:.1f}s** ({entry.get('source', '?')})"
+            for entry in reversed(entries[-10:])
+        )
+        embed.add_field(name="Recent Boots", value=recent, inline=False)
+        
+        trend = f"Median (last 10): **{summary['recent_median']:.1f}s**"
+        if summary.get('change_pct') is not None:
+            arrow = "📈" if summary['change_pct'] > 0 else "📉"
+            trend += f"\nPrevious 10: **{summary['previous_median']:.1f}s** {arrow} {summary['change_pct']:+.0f}%"
+        embed.add_field(name="Trend", value=trend, inline=False)
+        embed.set_footer(text=f"{summary['count']} boots recorded")
         await ctx.send(embed=embed)
     
     @commands.hybrid_command(name="serverip", description="Get the Minecraft server IP address")
@@ -316,9 +933,7 @@ class MinecraftCommands(commands.Cog):
     @commands.hybrid_command(name="playerlist", description="Check which players are online")
     async def player_list(self, ctx):
         """Shows the list of online players"""
-        await ctx.defer()
-        
-        servers = await self.get_servers()
+        servers, note = await self.servers_for_reply(ctx)
         if not servers:
             await ctx.send("❌ Failed to fetch server information. Please try again later.")
             return
@@ -334,38 +949,58 @@ class MinecraftCommands(commands.Cog):
                             4: "RUNNING", 5: "OFFLINE", 8: "STOPPING"}
                 status_text = state_map.get(server['state'], f"UNKNOWN (State {server['state']})")
             
-            await ctx.send(f"❌ Server is not running. Current status: **{status_text}**")
+            view = self.make_wake_view([server])
+            content = f"❌ Server is not running. Current status: **{status_text}**"
+            if note:
+                content += f"\n{note}"
+            message = await ctx.send(content, view=view)
+            if view:
+                view.message = message
             return
         
-        # Get player count from server info
-        player_count = server.get('playerCount', 0)
-        max_players = server.get('maxPlayers', 0)
+        # Ask the server itself, falling back to Minefort's (older) counts, then the console
+        _, live = await run_with_deadline(ctx, self.live_players(server), config.response_deadline)
+        player_count = live.online if live else server.get('playerCount', len(self.online_players))
+        max_players = live.max_players if live else server.get('maxPlayers', 0)
         
         embed = discord.Embed(
             title="Online Players",
             description=f"**{player_count}/{max_players}** players currently online",
             color=discord.Color.green() if player_count > 0 else discord.Color.light_gray()
         )
+        if note:
+            embed.description += f"\n{note}"
         
-        # If there's player data available, add it
-        if player_count > 0 and hasattr(server, 'players') and server.players:
-            player_names = [player.get('name', 'Unknown') for player in server.players]
-            embed.add_field(name="Players", value="\n".join(player_names), inline=False)
+        # Full roster from Query when the snapshot has one, else the ping's sample, else the console
+        names = server.get('players') or (live.sample if live else []) or sorted(self.online_players)
+        if player_count > 0 and names:
+            embed.add_field(name="Players", value=self.format_roster(names, player_count), inline=False)
         
-        embed.set_footer(text=f"Server: {server.get('serverName')} | Last Updated: {discord.utils.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC")
+        source = "Live" if live else "Minefort"
+        embed.set_footer(text=f"Server: {server.get('serverName')} | {source} | Last Updated: {discord.utils.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC")
         await ctx.send(embed=embed)
 
-    @commands.hybrid_command(name="startserver", description="Start the Minecraft server")
-    async def start_server(self, ctx):
-        """Starts the Minecraft server - Available to everyone in commands channel"""
-        # Check channel restriction
-        if ctx.channel.id != config.commands_channel_id:
-            await ctx.send("❌ This command can only be used in the commands channel.", ephemeral=True)
-            return
-        
-        await ctx.defer()
-        
-        servers = await self.get_servers()
+    @staticmethod
+    def format_roster(names, player_count, limit=1024):
+        """One name per line, within an embed field's length limit"""
+        lines = []
+        used = 0
+        for name in names:
+            remaining = player_count - len(lines)
+            more = f"...and {remaining - 1} more" if remaining > 1 else ""
+            if used + len(name) + 1 + len(more) > limit:
+                lines.append(f"...and {remaining} more")
+                return "\n".join(lines)
+            lines.append(name)
+            used += len(name) + 1
+        if player_count > len(lines):
+            lines.append(f"...and {player_count - len(lines)} more")
+        return "\n".join(lines)
+    
+    async def power_command(self, ctx, action, progress, verb, watch_boot=False):
+        """Shared body of the power commands: answer fast, never block on the follow-up refresh"""
+        # Only the server ID is needed, and that doesn't go stale
+        servers = self.servers_cache or (await self.servers_for_reply(ctx))[0]
         if not servers:
             await ctx.send("❌ Failed to fetch server information. Please try again later.")
             return
@@ -375,119 +1010,53 @@ class MinecraftCommands(commands.Cog):
         server_id = server.get('serverId')
         server_name = server.get('serverName', 'Unknown Server')
         
-        loop = asyncio.get_event_loop()
-        success, message = await loop.run_in_executor(
-            None, lambda: self.api.perform_server_action(server_id, 'start')
-        )
+        done, result = await run_with_deadline(ctx, self.run_server_action(server_id, action), config.response_deadline)
+        if not done:
+            # The request keeps going in the background; the status message will catch up
+            await ctx.send(f"⏳ Minefort hasn't confirmed yet, but the request to {verb} **{server_name}** is still being processed. "
+                           f"Check `/serverstatus` in a moment.")
+            self.spawn(self.refresh_after(5))
+            return
         
+        success, message = result
         if success:
-            await ctx.send(f"✅ Starting server **{server_name}**!\n{message}")
-            # Force refresh status
-            await asyncio.sleep(5)
-            await self.status_updater()
+            await ctx.send(f"✅ {progress} server **{server_name}**!\n{message}")
+            if watch_boot:
+                self.start_boot_watch(server_id, server_name, ctx.channel, ctx.author)
+            # Refresh once the action has taken effect; subscribers re-render
+            self.spawn(self.refresh_after(5))
         else:
-            await ctx.send(f"❌ Failed to start server: {message}")
+            await ctx.send(f"❌ Failed to {verb} server: {message}")
+    
+    async def refresh_after(self, delay):
+        await asyncio.sleep(delay)
+        await self.get_servers(force_refresh=True)
+
+    @commands.hybrid_command(name="startserver", description="Start the Minecraft server")
+    @in_channel('commands')
+    async def start_server(self, ctx):
+        """Starts the Minecraft server - Available to everyone in commands channel"""
+        await self.power_command(ctx, 'start', "Starting", "start", watch_boot=True)
 
     @commands.hybrid_command(name="wakeserver", description="Wake up the hibernating Minecraft server")
+    @in_channel('commands')
     async def wake_server(self, ctx):
         """Wakes up the hibernating Minecraft server - Available to everyone in commands channel"""
-        # Check channel restriction
-        if ctx.channel.id != config.commands_channel_id:
-            await ctx.send("❌ This command can only be used in the commands channel.", ephemeral=True)
-            return
-            
-        await ctx.defer()
-        
-        servers = await self.get_servers()
-        if not servers:
-            await ctx.send("❌ Failed to fetch server information. Please try again later.")
-            return
-        
-        # For simplicity, using the first server
-        server = servers[0]
-        server_id = server.get('serverId')
-        server_name = server.get('serverName', 'Unknown Server')
-        
-        loop = asyncio.get_event_loop()
-        success, message = await loop.run_in_executor(
-            None, lambda: self.api.perform_server_action(server_id, 'wakeup')
-        )
-        
-        if success:
-            await ctx.send(f"✅ Waking up server **{server_name}**!\n{message}")
-            # Force refresh status
-            await asyncio.sleep(5)
-            await self.status_updater()
-        else:
-            await ctx.send(f"❌ Failed to wake up server: {message}")
+        await self.power_command(ctx, 'wakeup', "Waking up", "wake up", watch_boot=True)
 
     @commands.hybrid_command(name="stopserver", description="Stop the Minecraft server")
-    @commands.has_any_role("Admin", "Moderator")
+    @staff_only()
+    @in_channel('cpanel')
     async def stop_server(self, ctx):
         """Stops the Minecraft server - Admin/Mod only in cPanel channel"""
-        # Check channel restriction
-        if ctx.channel.id != config.cpanel_channel_id:
-            await ctx.send("❌ This command can only be used in the cPanel channel.", ephemeral=True)
-            return
-            
-        await ctx.defer()
-        
-        servers = await self.get_servers()
-        if not servers:
-            await ctx.send("❌ Failed to fetch server information. Please try again later.")
-            return
-        
-        # For simplicity, using the first server
-        server = servers[0]
-        server_id = server.get('serverId')
-        server_name = server.get('serverName', 'Unknown Server')
-        
-        loop = asyncio.get_event_loop()
-        success, message = await loop.run_in_executor(
-            None, lambda: self.api.perform_server_action(server_id, 'kill')
-        )
-        
-        if success:
-            await ctx.send(f"✅ Stopping server **{server_name}**!\n{message}")
-            # Force refresh status
-            await asyncio.sleep(5)
-            await self.status_updater()
-        else:
-            await ctx.send(f"❌ Failed to stop server: {message}")
+        await self.power_command(ctx, 'kill', "Stopping", "stop")
 
     @commands.hybrid_command(name="sleepserver", description="Hibernate the Minecraft server")
-    @commands.has_any_role("Admin", "Moderator")
+    @staff_only()
+    @in_channel('cpanel')
     async def sleep_server(self, ctx):
         """Hibernates the Minecraft server - Admin/Mod only in cPanel channel"""
-        # Check channel restriction
-        if ctx.channel.id != config.cpanel_channel_id:
-            await ctx.send("❌ This command can only be used in the cPanel channel.", ephemeral=True)
-            return
-            
-        await ctx.defer()
-        
-        servers = await self.get_servers()
-        if not servers:
-            await ctx.send("❌ Failed to fetch server information. Please try again later.")
-            return
-        
-        # For simplicity, using the first server
-        server = servers[0]
-        server_id = server.get('serverId')
-        server_name = server.get('serverName', 'Unknown Server')
-        
-        loop = asyncio.get_event_loop()
-        success, message = await loop.run_in_executor(
-            None, lambda: self.api.perform_server_action(server_id, 'sleep')
-        )
-        
-        if success:
-            await ctx.send(f"✅ Hibernating server **{server_name}**!\n{message}")
-            # Force refresh status
-            await asyncio.sleep(5)
-            await self.status_updater()
-        else:
-            await ctx.send(f"❌ Failed to hibernate server: {message}")
+        await self.power_command(ctx, 'sleep', "Hibernating", "hibernate")
 
 async def setup(bot):
     await bot.add_cog(MinecraftCommands(bot))
@@ -1,7 +1,13 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import asyncio
+import os
+from typing import Optional
 from utils.config import config
+from utils.overwrite_batcher import OverwriteBatcher
+from utils.dm_queue import DMQueue
+from utils.responses import run_with_deadline
+from utils.voice_stats import VoiceTracker, VoiceStore, days_ago, format_duration, merge, rollup
 
 class VoiceChannels(commands.Cog):
     """
@@ -12,6 +18,40 @@ class VoiceChannels(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.temp_channels = {}  # track temp channels: {channel_id: owner_id}
+        self.overwrites = OverwriteBatcher()  # Merges lock/unlock/invite into one edit per channel
+        self.dm_queue = DMQueue()  # Paced DMs, started in cog_load
+        
+        # Voice time accounting, kept in memory and written out by flush_voice_stats
+        self.voice_tracker = VoiceTracker()
+        self.voice_store = None  # Opened in cog_load
+        self.unflushed = {}  # Rollups from a failed write, retried with the next batch
+    
+    async def cog_load(self):
+        """Start the DM queue, open the voice stats database and start the flush loop"""
+        self.dm_queue.start()
+        if not config.voice_stats:
+            return
+        self.voice_store = await asyncio.to_thread(VoiceStore, os.path.join(config.data_dir, 'voice_stats.db'))
+        self.flush_voice_stats.change_interval(seconds=config.voice_flush_interval)
+        self.flush_voice_stats.start()
+        if self.bot.is_ready():
+            # Reloaded: on_ready won't fire again
+            self.sync_voice_members()
+    
+    async def cog_unload(self):
+        """Write out what's buffered before the cog goes away"""
+        self.flush_voice_stats.cancel()
+        self.dm_queue.stop()
+        if self.voice_store:
+            await self.flush_voice_time()
+            await asyncio.to_thread(self.voice_store.close)
+            self.voice_store = None
+    
+    def counted_channel_id(self, guild, channel):
+        """Voice time counts in every channel except the AFK and "create VC" ones"""
+        if channel is None or channel == guild.afk_channel or channel.id == config.create_vc_channel_id:
+            return None
+        return channel.id
     
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after):
@@ -20,6 +60,10 @@ class VoiceChannels(commands.Cog):
         if member.bot:
             return
         
+        # Voice time accounting (memory only, never waits on I/O)
+        if config.voice_stats:
+            self.voice_tracker.update(member.guild.id, member.id, self.counted_channel_id(member.guild, after.channel))
+        
         # Check if member joined the "create VC" channel
         if after.channel and after.channel.id == config.create_vc_channel_id:
             await self.create_temp_voice_channel(member)
@@ -39,6 +83,40 @@ class VoiceChannels(commands.Cog):
             if channel and not channel.members:
                 await self.delete_temp_voice_channel(channel)
     
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Pick up who is in voice now, in case updates were missed while disconnected"""
+        if config.voice_stats:
+            self.sync_voice_members()
+    
+    def sync_voice_members(self):
+        present = {}
+        for guild in self.bot.guilds:
+            for channel in guild.voice_channels + guild.stage_channels:
+                if self.counted_channel_id(guild, channel) is None:
+                    continue
+                for member in channel.members:
+                    if not member.bot:
+                        present[member.id] = (guild.id, channel.id)
+        self.voice_tracker.sync(present)
+    
+    @tasks.loop(seconds=60)
+    async def flush_voice_stats(self):
+        """Periodically write buffered voice time to SQLite"""
+        await self.flush_voice_time()
+    
+    async def flush_voice_time(self):
+        """Write buffered voice time (and open sessions so far) in one transaction"""
+        segments = self.voice_tracker.drain()
+        rows = await asyncio.to_thread(rollup, segments)
+        merge(rows, self.unflushed)
+        self.unflushed = {}
+        try:
+            await asyncio.to_thread(self.voice_store.write, rows)
+        except Exception as e:
+            self.unflushed = rows
+            print(f"Error writing voice stats: {e}")
+    
     async def create_temp_voice_channel(self, member):
         """Create a temporary voice channel for the member"""
         # Get the temp VC category
@@ -82,30 +160,22 @@ class VoiceChannels(commands.Cog):
             await member.move_to(new_channel)
             
             # Send instructions as a DM
-            try:
-                embed = discord.Embed(
-                    title="Temporary Voice Channel Created",
-                    description=(
-                        f"Your voice channel **{channel_name}** has been created!\n\n"
-                        "**You can:**\n"
-                        "• Rename the channel\n"
-                        "• Control who can join\n"
-                        "• Mute/deafen others\n\n"
-                        "The channel will be deleted when everyone leaves."
-                    ),
-                    color=discord.Color.green()
-                )
-                await member.send(embed=embed)
-            except discord.Forbidden:
-                # If DM fails, send a message in the channel instead (visible only to them)
-                pass
-                
+            embed = discord.Embed(
+                title="Temporary Voice Channel Created",
+                description=(
+                    f"Your voice channel **{channel_name}** has been created!\n\n"
+                    "**You can:**\n"
+                    "• Rename the channel\n"
+                    "• Control who can join\n"
+                    "• Mute/deafen others\n\n"
+                    "The channel will be deleted when everyone leaves."
+                ),
+                color=discord.Color.green()
+            )
+            self.dm_queue.send(member, embed=embed)
         except discord.Forbidden:
             # Missing permissions
-            try:
-                await member.send("I don't have permission to create voice channels. Please contact a server administrator.")
-            except:
-                pass
+            self.dm_queue.send(member, content="I don't have permission to create voice channels. Please contact a server administrator.")
         except Exception as e:
             print(f"Error creating temp channel: {e}")
     
@@ -124,6 +194,28 @@ class VoiceChannels(commands.Cog):
         except Exception as e:
             print(f"Error deleting temp channel: {e}")
     
+    async def edit_overwrites(self, ctx, channel, changes):
+        """
+        Apply [(target, {permission: value})] through the batcher.
+        
+        Returns False if the channel is out of edit headroom and the change is
+        still queued at the response deadline; it is applied shortly after.
+        """
+        work = asyncio.gather(*(self.overwrites.update(channel, target, **permissions)
+                                for target, permissions in changes))
+        # Every voice command reply is ephemeral, so the deferral has to be too
+        done, _ = await run_with_deadline(ctx, work, config.response_deadline, ephemeral=True)
+        return done
+    
+    def owned_voice_channel(self, ctx):
+        """The temp channel the author is in and owns, or None"""
+        if not ctx.author.voice or not ctx.author.voice.channel:
+            return None
+        channel = ctx.author.voice.channel
+        if self.temp_channels.get(channel.id) != ctx.author.id:
+            return None
+        return channel
+    
     @commands.hybrid_command(name="lock", description="Lock your voice channel to prevent others from joining")
     async def lock_voice_channel(self, ctx):
         """Lock your temporary voice channel"""
@@ -132,15 +224,17 @@ class VoiceChannels(commands.Cog):
             await ctx.send("You need to be in a voice channel to use this command.", ephemeral=True)
             return
             
-        channel = ctx.author.voice.channel
-        if channel.id not in self.temp_channels or self.temp_channels[channel.id] != ctx.author.id:
+        channel = self.owned_voice_channel(ctx)
+        if not channel:
             await ctx.send("You can only lock voice channels you created.", ephemeral=True)
             return
         
         # Lock the channel
         try:
-            await channel.set_permissions(ctx.guild.default_role, connect=False)
-            await ctx.send(f"🔒 Voice channel locked! Only you can add people now.", ephemeral=True)
+            if await self.edit_overwrites(ctx, channel, [(ctx.guild.default_role, {"connect": False})]):
+                await ctx.send(f"🔒 Voice channel locked! Only you can add people now.", ephemeral=True)
+            else:
+                await ctx.send("⏳ Discord is limiting edits to this channel; it will be locked in a few seconds.", ephemeral=True)
         except Exception as e:
             await ctx.send(f"Failed to lock channel: {e}", ephemeral=True)
     
@@ -152,49 +246,119 @@ class VoiceChannels(commands.Cog):
             await ctx.send("You need to be in a voice channel to use this command.", ephemeral=True)
             return
             
-        channel = ctx.author.voice.channel
-        if channel.id not in self.temp_channels or self.temp_channels[channel.id] != ctx.author.id:
+        channel = self.owned_voice_channel(ctx)
+        if not channel:
             await ctx.send("You can only unlock voice channels you created.", ephemeral=True)
             return
         
         # Unlock the channel
         try:
-            await channel.set_permissions(ctx.guild.default_role, connect=True)
-            await ctx.send(f"🔓 Voice channel unlocked! Anyone can join now.", ephemeral=True)
+            if await self.edit_overwrites(ctx, channel, [(ctx.guild.default_role, {"connect": True})]):
+                await ctx.send(f"🔓 Voice channel unlocked! Anyone can join now.", ephemeral=True)
+            else:
+                await ctx.send("⏳ Discord is limiting edits to this channel; it will be unlocked in a few seconds.", ephemeral=True)
         except Exception as e:
             await ctx.send(f"Failed to unlock channel: {e}", ephemeral=True)
     
-    @commands.hybrid_command(name="invite", description="Invite a user to your locked voice channel")
-    async def invite_to_voice_channel(self, ctx, member: discord.Member):
-        """Invite a specific user to your locked voice channel"""
+    @commands.hybrid_command(name="invite", description="Invite up to 8 users to your locked voice channel")
+    async def invite_to_voice_channel(self, ctx, member: discord.Member,
+                                      member2: Optional[discord.Member] = None,
+                                      member3: Optional[discord.Member] = None,
+                                      member4: Optional[discord.Member] = None,
+                                      member5: Optional[discord.Member] = None,
+                                      member6: Optional[discord.Member] = None,
+                                      member7: Optional[discord.Member] = None,
+                                      member8: Optional[discord.Member] = None):
+        """Invite specific users to your locked voice channel"""
         # Check if user is in a voice channel they own
         if not ctx.author.voice or not ctx.author.voice.channel:
             await ctx.send("You need to be in a voice channel to use this command.", ephemeral=True)
             return
             
-        channel = ctx.author.voice.channel
-        if channel.id not in self.temp_channels or self.temp_channels[channel.id] != ctx.author.id:
+        channel = self.owned_voice_channel(ctx)
+        if not channel:
             await ctx.send("You can only invite users to voice channels you created.", ephemeral=True)
             return
         
-        # Add permission for the member
+        members = list(dict.fromkeys(m for m in (member, member2, member3, member4, member5, member6, member7, member8) if m))
+        mentions = ", ".join(m.mention for m in members)
+        
+        # One channel edit for everyone
         try:
-            await channel.set_permissions(member, connect=True)
-            await ctx.send(f"✅ {member.mention} can now join your voice channel.", ephemeral=True)
-            
-            # Notify the invited user
-            try:
-                embed = discord.Embed(
-                    title="Voice Channel Invitation",
-                    description=f"**{ctx.author.display_name}** has invited you to their voice channel: **{channel.name}**",
-                    color=discord.Color.blue()
-                )
-                await member.send(embed=embed)
-            except discord.Forbidden:
-                await ctx.send(f"I couldn't DM {member.mention}, but they have been granted access to join.", ephemeral=True)
-                
+            if await self.edit_overwrites(ctx, channel, [(m, {"connect": True}) for m in members]):
+                await ctx.send(f"✅ {mentions} can now join your voice channel.", ephemeral=True)
+            else:
+                await ctx.send(f"⏳ Discord is limiting edits to this channel; {mentions} will be able to join in a few seconds.", ephemeral=True)
         except Exception as e:
-            await ctx.send(f"Failed to invite user: {e}", ephemeral=True)
+            await ctx.send(f"Failed to invite users: {e}", ephemeral=True)
+            return
+        
+        # Notify the invited users from the background queue
+        async def dm_failed(user, error):
+            await ctx.send(f"I couldn't DM {user.mention}, but they have been granted access to join.", ephemeral=True)
+        
+        embed = discord.Embed(
+            title="Voice Channel Invitation",
+            description=f"**{ctx.author.display_name}** has invited you to their voice channel: **{channel.name}**",
+            color=discord.Color.blue()
+        )
+        for m in members:
+            self.dm_queue.send(m, on_failure=dm_failed, embed=embed)
+    
+    @commands.hybrid_command(name="voicetop", description="Show who has spent the most time in voice")
+    @commands.guild_only()
+    async def voice_top(self, ctx, days: commands.Range[int, 1, 365] = 7):
+        """Voice time leaderboard for the last few days"""
+        if not self.voice_store:
+            await ctx.send("Voice stats are turned off.", ephemeral=True)
+            return
+        
+        rows = await asyncio.to_thread(self.voice_store.top_members, ctx.guild.id, days_ago(days), 10)
+        if not rows:
+            await ctx.send(f"No voice activity recorded in the last {days} days.", ephemeral=True)
+            return
+        
+        lines = [f"**{rank}.** <@{member_id}> - {format_duration(seconds)}"
+                 for rank, (member_id, seconds) in enumerate(rows, start=1)]
+        embed = discord.Embed(
+            title="🎙️ Voice Leaderboard",
+            description="\n".join(lines),
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text=f"Last {days} days | Updated every {config.voice_flush_interval}s")
+        await ctx.send(embed=embed)
+    
+    @commands.hybrid_command(name="voicestats", description="Show voice activity for the server or a member")
+    @commands.guild_only()
+    async def voice_stats(self, ctx, member: Optional[discord.Member] = None, days: commands.Range[int, 1, 365] = 30):
+        """Voice time totals for the server, or for one member"""
+        if not self.voice_store:
+            await ctx.send("Voice stats are turned off.", ephemeral=True)
+            return
+        
+        since = days_ago(days)
+        if member:
+            stats = await asyncio.to_thread(self.voice_store.member_stats, ctx.guild.id, member.id, since)
+            title = f"🎙️ Voice Stats: {member.display_name}"
+            summary = f"Active on **{stats['days']}** of the last {days} days"
+        else:
+            stats = await asyncio.to_thread(self.voice_store.guild_stats, ctx.guild.id, since)
+            title = "🎙️ Server Voice Stats"
+            summary = f"**{stats['members']}** members in voice over the last {days} days"
+        
+        if not stats['seconds']:
+            await ctx.send(f"No voice activity recorded in the last {days} days.", ephemeral=True)
+            return
+        
+        embed = discord.Embed(title=title, description=summary, color=discord.Color.blue())
+        embed.add_field(name="Time in Voice", value=format_duration(stats['seconds']), inline=True)
+        embed.add_field(name="Sessions", value=str(stats['sessions']), inline=True)
+        if stats['sessions']:
+            embed.add_field(name="Average Session", value=format_duration(stats['seconds'] / stats['sessions']), inline=True)
+        channels = "\n".join(f"<#{channel_id}> - {format_duration(seconds)}" for channel_id, seconds in stats['channels'])
+        embed.add_field(name="Top Channels", value=channels, inline=False)
+        embed.set_footer(text=f"Updated every {config.voice_flush_interval}s")
+        await ctx.send(embed=embed)
 
 async def setup(bot):
     await bot.add_cog(VoiceChannels(bot))
\ No newline at end of file
@@ -1,3 +1,5 @@
+from utils.startup import startup
+
 import voice_patch
 
 import discord
@@ -6,6 +8,12 @@ import asyncio
 import os
 import logging
 from utils.config import config
+from utils.loop_monitor import loop_monitor
+from utils.command_sync import sync_commands
+from utils.runtime_profile import gateway_options, measure, ProfileReport
+from utils.gateway_stats import gateway_stats
+from utils.permissions import access
+from utils.responses import TimedContext
 
 from webserver import keep_alive
 
@@ -18,20 +26,52 @@ logging.basicConfig(
     ]
 )
 logger = logging.getLogger('bot')
+startup.mark('imports')
+
+# Intents and member caching depend on the runtime profile
+runtime_profile = config.runtime_profile
+profile_report = ProfileReport(os.path.join(config.data_dir, 'runtime_profile.json'))
 
-# Define intents
-intents = discord.Intents.default()
-intents.message_content = True
-intents.members = True
-intents.voice_states = True  # Required for voice channel features
+class Bot(commands.Bot):
+    """commands.Bot with gateway event accounting and an optional slash-only mode"""
+    
+    def __init__(self, *args, slash_only=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.slash_only = slash_only
+    
+    def dispatch(self, event_name, /, *args, **kwargs):
+        # Runs synchronously for every event, before any listener task is created
+        if event_name == 'socket_event_type':
+            gateway_stats.record(args[0])
+        elif event_name == 'message' and self.slash_only and not access.in_channel(args[0].channel.id, 'console'):
+            return  # Only the console channel reads messages in slash-only mode
+        super().dispatch(event_name, *args, **kwargs)
+    
+    async def on_message(self, message):
+        if not self.slash_only:
+            await self.process_commands(message)
+    
+    async def get_context(self, origin, /, *, cls=TimedContext):
+        # Every command context records its time to first response
+        return await super().get_context(origin, cls=cls)
 
 # Create bot instance
-bot = commands.Bot(command_prefix='!', intents=intents)
+bot = Bot(
+    command_prefix='!',
+    slash_only=config.slash_only,
+    **gateway_options(runtime_profile, slash_only=config.slash_only, console_input=bool(config.console_channel_id))
+)
 keep_alive(bot)
 
+# on_ready fires again after every gateway reconnect; commands only need syncing once
+commands_synced = False
+profile_recorded = False
+
 @bot.event
 async def on_ready():
     """Called when the bot is ready to start working"""
+    global commands_synced, profile_recorded
+    startup.mark('ready')
     logger.info(f'Bot logged in as {bot.user.name} ({bot.user.id})')
     
     # Set activity status
@@ -42,13 +82,31 @@ async def on_ready():
         )
     )
     
-    # Sync app commands with Discord
-    try:
-        logger.info("Syncing application commands...")
-        await bot.tree.sync()
-        logger.info("Application commands synced successfully!")
-    except Exception as e:
-        logger.error(f"Failed to sync application commands: {e}")
+    # Memory and time to ready for this profile, kept for comparing profiles in /diag
+    if not profile_recorded:
+        profile_recorded = True
+        measurement = measure(bot, runtime_profile, round(startup.milestones['ready'] * 1000))
+        logger.info(f"Runtime profile '{runtime_profile}': {measurement['rss_mb']}MB RSS, "
+                    f"{measurement['members_cached']} members cached")
+        try:
+            await asyncio.to_thread(profile_report.record, measurement)
+        except Exception as e:
+            logger.error(f"Failed to save runtime profile report: {e}")
+    
+    # Sync app commands with Discord, but only if the tree changed since the last sync
+    if not commands_synced:
+        try:
+            synced = await sync_commands(
+                bot,
+                os.path.join(config.data_dir, 'command_sync.json'),
+                dev_guild_id=config.dev_guild_id,
+                force=config.force_command_sync
+            )
+            commands_synced = True
+            if synced:
+                logger.info("Application commands synced successfully!")
+        except Exception as e:
+            logger.error(f"Failed to sync application commands: {e}")
     
     logger.info("Bot is ready!")
 
@@ -63,29 +121,62 @@ async def on_command_error(ctx, error):
         await ctx.send(f"Bad argument: {error}")
     elif isinstance(error, commands.MissingPermissions) or isinstance(error, commands.MissingRole):
         await ctx.send("You don't have permission to use this command.")
+    elif isinstance(error, commands.CheckFailure):
+        await ctx.send(str(error) or "You don't have permission to use this command.", ephemeral=True)
     elif isinstance(error, commands.CommandOnCooldown):
         await ctx.send(f"This command is on cooldown. Try again in {error.retry_after:.1f} seconds.")
     else:
         logger.error(f"Command error in {ctx.command}: {error}")
         await ctx.send("An error occurred while processing this command.")
 
+async def load_extension(name):
+    """Load a single cog, logging instead of raising on failure"""
+    try:
+        await bot.load_extension(name)
+        logger.info(f"Loaded extension {name.split('.')[-1]}")
+    except Exception as e:
+        logger.error(f"Failed to load extension {name.split('.')[-1]}: {e}")
+
 async def load_extensions():
-    """Load all cogs"""
+    """Load all cogs concurrently (they don't depend on each other)"""
     cogs_dir = "cogs"
-    for filename in os.listdir(cogs_dir):
-        if filename.endswith('.py') and not filename.startswith('__'):
-            try:
-                await bot.load_extension(f"{cogs_dir}.{filename[:-3]}")
-                logger.info(f"Loaded extension {filename[:-3]}")
-            except Exception as e:
-                logger.error(f"Failed to load extension {filename[:-3]}: {e}")
+    names = [
+        f"{cogs_dir}.{filename[:-3]}"
+        for filename in sorted(os.listdir(cogs_dir))
+        if filename.endswith('.py') and not filename.startswith('__')
+    ]
+    with startup.phase('cog_load'):
+        await asyncio.gather(*(load_extension(name) for name in names))
+
+async def prefetch_minefort():
+    """Warm the Minefort server cache so the first status render doesn't wait on it"""
+    cog = bot.get_cog('MinecraftCommands')
+    if not cog:
+        return
+    try:
+        await cog.prefetch()
+    except Exception as e:
+        # Not fatal: the first poll fills the cache instead
+        logger.warning(f"Minefort prefetch failed: {e}")
+
+async def load_and_prefetch():
+    """Load cogs, then start the Minefort prefetch in the background"""
+    await load_extensions()
+    return asyncio.create_task(prefetch_minefort())
+
+async def login(token):
+    """Authenticate with Discord's REST API"""
+    with startup.phase('login'):
+        await bot.login(token)
 
 async def main():
     """Main entry point for the bot"""
-    # First load all cogs
-    await load_extensions()
+    # Watch for blocking calls that stall the event loop
+    loop_monitor.install(threshold=config.loop_slow_threshold_ms / 1000)
+    
+    # Pick up config.json edits without a restart
+    config.start_watching()
     
-    # Then start the bot
     token = config.token
     if not token:
         logger.error("No Discord token provided. Please set DISCORD_TOKEN environment variable.")
@@ -95,12 +186,22 @@ async def main():
     if not config.minefort_email or not config.minefort_password:
         logger.warning("Minefort credentials are not set. Server management features will not work.")
     
+    prefetch_task = None
     try:
-        await bot.start(token)
+        async with bot:
+            # Cog loading is local work and login is a REST round-trip, so overlap them.
+            # The Minefort prefetch keeps running alongside the gateway handshake.
+            prefetch_task, _ = await asyncio.gather(load_and_prefetch(), login(token))
+            await bot.connect()
     except discord.LoginFailure:
         logger.error("Invalid Discord token. Please check your DISCORD_TOKEN environment variable.")
     except Exception as e:
         logger.error(f"Error starting bot: {e}")
+    finally:
+        # Don't leave a pending prefetch to be destroyed when the loop closes
+        if prefetch_task and not prefetch_task.done():
+            prefetch_task.cancel()
+            await asyncio.gather(prefetch_task, return_exceptions=True)
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,310 @@
+"""
+Local stand-in for the Minefort API, for offline testing and load tests.
+
+Usage: python -m tools.fake_minefort [--port 8765] [--servers 3] [--latency 0.05]
+Then point the bot or CLI at it with MINEFORT_API_URL=http://127.0.0.1:8765/v1
+(any email and password are accepted).
+
+Servers follow the real state machine: wakeup 0 -> 3 -> 4, kill 4 -> 8 -> 5,
+start 5 -> 3 -> 4, sleep 4/5 -> 8 -> 0. Running servers keep writing console
+output. Latency, 429s and expired sessions (401) can be injected, and
+/user/servers and /console honour If-None-Match.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import secrets
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+HIBERNATING, PROCESSING, STARTING, RUNNING, OFFLINE, STOPPING = 0, 1, 3, 4, 5, 8
+
+# action -> (states it is allowed from, transitional state, final state)
+TRANSITIONS = {
+    'wakeup': ({HIBERNATING}, STARTING, RUNNING),
+    'start': ({OFFLINE}, STARTING, RUNNING),
+    'kill': ({STARTING, RUNNING}, STOPPING, OFFLINE),
+    'sleep': ({RUNNING, OFFLINE}, STOPPING, HIBERNATING),
+}
+
+PLAYER_NAMES = ["Steve", "Alex", "Notch", "Herobrine", "Jeb_", "Dinnerbone", "Grumm", "Kai", "Zuri", "Sunny"]
+CHAT = ["anyone up for the nether?", "brb", "lag?", "gg", "who took my diamonds", "nice base"]
+
+
+@dataclass
+class FakeServer:
+    server_id: str
+    name: str
+    state: int = HIBERNATING
+    max_players: int = 20
+    players: List[str] = field(default_factory=list)
+    console: List[str] = field(default_factory=list)
+    pending_state: Optional[int] = None
+    transition_at: float = 0.0
+    booted_at: float = 0.0
+
+    def log(self, message: str, level: str = "INFO", thread: str = "Server thread"):
+        stamp = time.strftime("%H:%M:%S")
+        self.console.append(f"[{stamp}] [{thread}/{level}]: {message}")
+
+    def to_json(self) -> dict:
+        return {
+            "serverId": self.server_id,
+            "serverName": self.name,
+            "state": self.state,
+            "playerCount": len(self.players),
+            "maxPlayers": self.max_players,
+            "players": list(self.players),
+        }
+
+
+class FakeMinefort:
+    """
+    In-process fake Minefort backend.
+
+    Time-based transitions are applied lazily whenever a server is read, and a
+    background ticker adds console activity to running servers.
+    """
+
+    def __init__(self, servers: int = 3, latency: float = 0.0, jitter: float = 0.0,
+                 rate_429: float = 0.0, rate_401: float = 0.0, transition_seconds: float = 5.0,
+                 console_interval: float = 1.0, console_window: int = 100, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.rate_401 = rate_401
+        self.transition_seconds = transition_seconds
+        self.console_interval = console_interval
+        self.console_window = console_window
+        self.random = random.Random(seed)
+        self.sessions = set()
+        self.requests = 0
+        self.servers: Dict[str, FakeServer] = {}
+        for i in range(servers):
+            server = FakeServer(server_id=f"fake{i:04d}", name=f"Fake Server {i + 1}")
+            server.log("Server is hibernating")
+            self.servers[server.server_id] = server
+        self._ticker: Optional[asyncio.Task] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    # State machine
+
+    def advance(self, server: FakeServer, now: Optional[float] = None):
+        """Apply a pending transition once its time has come"""
+        now = time.monotonic() if now is None else now
+        if server.pending_state is None or now < server.transition_at:
+            return
+        server.state = server.pending_state
+        server.pending_state = None
+        if server.state == RUNNING:
+            server.log(f'Done ({now - server.booted_at:.3f}s)! For help, type "help"')
+        elif server.state == OFFLINE:
+            server.log("Server stopped")
+        elif server.state == HIBERNATING:
+            server.log("Server is hibernating")
+
+    def perform(self, server: FakeServer, action: str) -> bool:
+        allowed, transitional, final = TRANSITIONS[action]
+        self.advance(server)
+        if server.state not in allowed or server.pending_state is not None:
+            return False
+        now = time.monotonic()
+        server.state = transitional
+        server.pending_state = final
+        server.transition_at = now + self.transition_seconds
+        if transitional == STARTING:
+            server.booted_at = now
+            server.log("Starting minecraft server version 1.20.4")
+            server.log("Preparing level \"world\"")
+        else:
+            server.log("Stopping server")
+            for player in server.players:
+                server.log(f"{player} left the game")
+            server.players.clear()
+        return True
+
+    def tick(self):
+        """Generate a little console activity on every running server"""
+        for server in self.servers.values():
+            self.advance(server)
+            if server.state != RUNNING:
+                continue
+            roll = self.random.random()
+            if roll < 0.3 and len(server.players) < server.max_players:
+                player = self.random.choice([p for p in PLAYER_NAMES if p not in server.players] or ["Player"])
+                server.players.append(player)
+                server.log(f"{player} joined the game")
+            elif roll < 0.45 and server.players:
+                player = server.players.pop(self.random.randrange(len(server.players)))
+                server.log(f"{player} left the game")
+            elif roll < 0.8 and server.players:
+                server.log(f"<{self.random.choice(server.players)}> {self.random.choice(CHAT)}",
+                           thread="Async Chat Thread - #0")
+            elif roll < 0.85:
+                ms = self.random.randint(2000, 8000)
+                server.log(f"Can't keep up! Is the server overloaded? Running {ms}ms or {ms // 50} ticks behind",
+                           level="WARN")
+            else:
+                server.log("Saving chunks for level 'ServerLevel[world]'/minecraft:overworld")
+
+    async def _tick_forever(self):
+        while True:
+            await asyncio.sleep(self.console_interval)
+            self.tick()
+
+    # HTTP
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler):
+        self.requests += 1
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.rate_429 and self.random.random() < self.rate_429:
+            return web.json_response({"message": "Too many requests"}, status=429, headers={"Retry-After": "1"})
+        if request.path.endswith("/auth/login"):
+            return await handler(request)
+
+        session = request.cookies.get("session")
+        if session not in self.sessions:
+            return web.json_response({"message": "Unauthorized"}, status=401)
+        if self.rate_401 and self.random.random() < self.rate_401:
+            self.sessions.discard(session)  # Simulate the session expiring
+            return web.json_response({"message": "Session expired"}, status=401)
+        return await handler(request)
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self.middleware])
+        app.add_routes([
+            web.post("/v1/auth/login", self.handle_login),
+            web.get("/v1/user/servers", self.handle_servers),
+            web.get("/v1/server/{server_id}/console", self.handle_console),
+            web.post("/v1/server/{server_id}/command", self.handle_command),
+            web.post("/v1/server/{server_id}/{action}", self.handle_action),
+        ])
+        return app
+
+    def _server(self, request: web.Request) -> FakeServer:
+        server = self.servers.get(request.match_info["server_id"])
+        if server is None:
+            raise web.HTTPNotFound(text=json.dumps({"message": "Server not found"}), content_type="application/json")
+        self.advance(server)
+        return server
+
+    @staticmethod
+    def _etag_response(request: web.Request, body: dict) -> web.Response:
+        data = json.dumps(body).encode()
+        etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=data, content_type="application/json", headers={"ETag": etag})
+
+    async def handle_login(self, request: web.Request) -> web.Response:
+        try:
+            payload = await request.json()
+        except ValueError:
+            payload = {}
+        if not payload.get("emailAddress") or not payload.get("password"):
+            return web.json_response({"message": "Invalid credentials"}, status=401)
+        session = secrets.token_hex(16)
+        self.sessions.add(session)
+        response = web.json_response({"message": "Logged in"})
+        response.set_cookie("session", session)
+        return response
+
+    async def handle_servers(self, request: web.Request) -> web.Response:
+        for server in self.servers.values():
+            self.advance(server)
+        return self._etag_response(request, {"result": [s.to_json() for s in self.servers.values()]})
+
+    async def handle_action(self, request: web.Request) -> web.Response:
+        action = request.match_info["action"]
+        if action not in TRANSITIONS:
+            raise web.HTTPNotFound()
+        server = self._server(request)
+        if not self.perform(server, action):
+            return web.json_response({"message": f"Cannot {action} a server in state {server.state}"}, status=409)
+        return web.json_response({"message": "OK"})
+
+    async def handle_console(self, request: web.Request) -> web.Response:
+        server = self._server(request)
+        return self._etag_response(request, {"logs": "\n".join(server.console[-self.console_window:])})
+
+    async def handle_command(self, request: web.Request) -> web.Response:
+        server = self._server(request)
+        if server.state != RUNNING:
+            return web.json_response({"message": "Server is not running"}, status=409)
+        try:
+            command = (await request.json()).get("command", "")
+        except ValueError:
+            command = ""
+        if command == "list":
+            server.log(f"There are {len(server.players)} of a max of {server.max_players} players online: "
+                       + ", ".join(server.players))
+        elif command.startswith("say "):
+            server.log(f"[Server] {command[4:]}")
+        else:
+            server.log(f"Issued server command: /{command}")
+        return web.json_response({"message": "OK"})
+
+    # Lifecycle
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve in the running loop; returns the base URL for MinefortAPI"""
+        self._runner = web.AppRunner(self.create_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        if self.console_interval > 0:
+            self._ticker = asyncio.create_task(self._tick_forever())
+        return f"http://{host}:{port}/v1"
+
+    async def stop(self):
+        if self._ticker:
+            self._ticker.cancel()
+            self._ticker = None
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def serve(args):
+    fake = FakeMinefort(
+        servers=args.servers, latency=args.latency, jitter=args.jitter, rate_429=args.rate_429,
+        rate_401=args.rate_401, transition_seconds=args.transition, console_interval=args.console_interval,
+        seed=args.seed,
+    )
+    url = await fake.start(args.host, args.port)
+    print(f"Fake Minefort API listening on {url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await fake.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--servers", type=int, default=3, help="Number of fake servers")
+    parser.add_argument("--latency", type=float, default=0.05, help="Base response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency up to this many seconds")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--rate-401", type=float, default=0.0, help="Fraction of requests that expire the session")
+    parser.add_argument("--transition", type=float, default=5.0, help="Seconds spent in STARTING/STOPPING")
+    parser.add_argument("--console-interval", type=float, default=1.0, help="Seconds between console lines")
+    parser.add_argument("--seed", type=int, default=None)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
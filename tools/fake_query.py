@@ -0,0 +1,131 @@
+"""
+Local Minecraft Query (UDP) responder, for testing utils.query.
+
+Usage: python -m tools.fake_query [--port 25599] [--players Steve,Alex] [--token-interval 30]
+Then point the bot at it with QUERY_ENABLED=true QUERY_ADDRESS=127.0.0.1:25599.
+"""
+import argparse
+import asyncio
+import random
+import struct
+import time
+from typing import Callable, List, Optional, Union
+
+from utils.query import HANDSHAKE, MAGIC, PLAYERS_PADDING, STAT, STAT_PADDING
+
+Players = Union[List[str], Callable[[], List[str]]]
+
+
+class FakeQuery(asyncio.DatagramProtocol):
+    """
+    Answers handshakes and full stat requests like a vanilla server.
+
+    Challenge tokens rotate every `token_interval` seconds and requests with
+    any other token are dropped without a reply, as real servers do.
+    """
+
+    def __init__(self, players: Players = (), max_players: int = 20, motd: str = "A Fake Minecraft Server",
+                 version: str = "1.20.4", map_name: str = "world",
+                 plugins: str = "Paper on 1.20.4: EssentialsX 2.20.1; LuckPerms 5.4.102",
+                 token_interval: float = 30.0, latency: float = 0.0):
+        self.players = players
+        self.max_players = max_players
+        self.motd = motd
+        self.version = version
+        self.map_name = map_name
+        self.plugins = plugins
+        self.token_interval = token_interval
+        self.latency = latency
+        self.token = random.randrange(1, 2 ** 31)
+        self.token_issued = time.monotonic()
+        self.handshakes = 0
+        self.stats = 0
+        self.rejected = 0
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+    def current_token(self) -> int:
+        if time.monotonic() - self.token_issued >= self.token_interval:
+            self.rotate_token()
+        return self.token
+
+    def rotate_token(self):
+        self.token = random.randrange(1, 2 ** 31)
+        self.token_issued = time.monotonic()
+
+    def full_stat(self) -> bytes:
+        names = list(self.players() if callable(self.players) else self.players)
+        values = [
+            ("hostname", self.motd), ("gametype", "SMP"), ("game_id", "MINECRAFT"),
+            ("version", self.version), ("plugins", self.plugins), ("map", self.map_name),
+            ("numplayers", str(len(names))), ("maxplayers", str(self.max_players)),
+            ("hostport", "25565"), ("hostip", "127.0.0.1"),
+        ]
+        kv = b"".join(key.encode() + b"\x00" + value.encode() + b"\x00" for key, value in values) + b"\x00"
+        players = b"".join(name.encode() + b"\x00" for name in names) + b"\x00"
+        return STAT_PADDING + kv + PLAYERS_PADDING + players
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if len(data) < 7 or data[:2] != MAGIC:
+            return
+        packet_type, session = struct.unpack('>Bi', data[2:7])
+        if packet_type == HANDSHAKE:
+            self.handshakes += 1
+            response = str(self.current_token()).encode() + b"\x00"
+        elif packet_type == STAT and len(data) >= 11:
+            if struct.unpack('>i', data[7:11])[0] != self.current_token():
+                self.rejected += 1
+                return
+            self.stats += 1
+            response = self.full_stat()
+        else:
+            return
+        reply = struct.pack('>Bi', packet_type, session) + response
+        if self.latency:
+            asyncio.get_running_loop().call_later(self.latency, self.transport.sendto, reply, addr)
+        else:
+            self.transport.sendto(reply, addr)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Listen in the running loop; returns the address for QueryClient"""
+        loop = asyncio.get_running_loop()
+        await loop.create_datagram_endpoint(lambda: self, local_addr=(host, port))
+        return f"{host}:{self.transport.get_extra_info('sockname')[1]}"
+
+    async def stop(self):
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+
+
+async def serve(args):
+    players = [name for name in args.players.split(',') if name]
+    fake = FakeQuery(players, max_players=args.max, motd=args.motd, token_interval=args.token_interval,
+                     latency=args.latency)
+    address = await fake.start(args.host, args.port)
+    print(f"Fake Query responder listening on udp://{address}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await fake.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=25599)
+    parser.add_argument("--players", default="Steve,Alex", help="Comma-separated online players")
+    parser.add_argument("--max", type=int, default=20, help="Max players")
+    parser.add_argument("--motd", default="A Fake Minecraft Server")
+    parser.add_argument("--token-interval", type=float, default=30.0, help="Seconds between challenge token changes")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each response")
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
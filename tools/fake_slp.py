@@ -0,0 +1,115 @@
+"""
+Local Minecraft server that only answers Server List Ping, for testing utils.slp.
+
+Usage: python -m tools.fake_slp [--port 25599] [--players Steve,Alex] [--max 20]
+Then point the bot at it with SLP_ADDRESS=127.0.0.1:25599.
+"""
+import argparse
+import asyncio
+import json
+import uuid
+from typing import Callable, List, Optional, Union
+
+from utils.slp import decode_varint, encode_string, packet, read_packet
+
+Players = Union[List[str], Callable[[], List[str]]]
+
+
+class FakeSLP:
+    """
+    Answers status and ping requests like a vanilla server.
+
+    `players` may be a list or a callable returning one (e.g. the players of a
+    FakeMinefort server). `latency` delays each response, `hide_sample` mimics
+    servers that don't list player names.
+    """
+
+    def __init__(self, players: Players = (), max_players: int = 20, motd: str = "A Fake Minecraft Server",
+                 version: str = "1.20.4", latency: float = 0.0, hide_sample: bool = False):
+        self.players = players
+        self.max_players = max_players
+        self.motd = motd
+        self.version = version
+        self.latency = latency
+        self.hide_sample = hide_sample
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def status_json(self) -> dict:
+        names = list(self.players() if callable(self.players) else self.players)
+        players = {"online": len(names), "max": self.max_players}
+        if names and not self.hide_sample:
+            players["sample"] = [{"name": name, "id": str(uuid.uuid3(uuid.NAMESPACE_OID, name))}
+                                 for name in names[:12]]
+        return {
+            "version": {"name": self.version, "protocol": 765},
+            "players": players,
+            "description": {"text": self.motd},
+        }
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            packet_id, payload = await read_packet(reader)
+            if packet_id != 0x00:
+                return
+            # Handshake: protocol, host, port, next state (1 = status)
+            _, offset = decode_varint(payload)
+            host_length, offset = decode_varint(payload, offset)
+            next_state, _ = decode_varint(payload, offset + host_length + 2)
+            if next_state != 1:
+                return
+            while True:
+                packet_id, payload = await read_packet(reader)
+                self.requests += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if packet_id == 0x00:
+                    writer.write(packet(0x00, encode_string(json.dumps(self.status_json()))))
+                elif packet_id == 0x01:
+                    writer.write(packet(0x01, payload))  # Pong echoes the payload
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Listen in the running loop; returns the address for SLPClient"""
+        self._server = await asyncio.start_server(self.handle, host, port)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"{host}:{port}"
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+async def serve(args):
+    players = [name for name in args.players.split(',') if name]
+    fake = FakeSLP(players, max_players=args.max, motd=args.motd, latency=args.latency)
+    address = await fake.start(args.host, args.port)
+    print(f"Fake Server List Ping listening on {address}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await fake.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=25599)
+    parser.add_argument("--players", default="Steve,Alex", help="Comma-separated online players")
+    parser.add_argument("--max", type=int, default=20, help="Max players")
+    parser.add_argument("--motd", default="A Fake Minecraft Server")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each response")
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import json
+import statistics
+import threading
+from typing import Any, Dict, List
+
+from utils.config import atomic_write_json
+
+
+class BootHistory:
+    """Persistent record of how long server boots took, newest last"""
+
+    def __init__(self, path: str, max_entries: int = 200):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def load(self) -> List[Dict[str, Any]]:
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, list) else []
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def append(self, entry: Dict[str, Any]):
+        """Add a boot record (blocking; call from a worker thread)"""
+        with self._lock:
+            entries = self.load()
+            entries.append(entry)
+            atomic_write_json(self.path, entries[-self.max_entries:])
+
+    @staticmethod
+    def summarize(entries: List[Dict[str, Any]], window: int = 10) -> Dict[str, Any]:
+        """Median boot time of the latest window compared to the window before it"""
+        durations = [entry['seconds'] for entry in entries if entry.get('seconds') is not None]
+        recent = durations[-window:]
+        previous = durations[-2 * window:-window]
+        summary = {
+            "count": len(durations),
+            "recent_median": statistics.median(recent) if recent else None,
+            "previous_median": statistics.median(previous) if previous else None,
+        }
+        if summary["recent_median"] and summary["previous_median"]:
+            summary["change_pct"] = (summary["recent_median"] / summary["previous_median"] - 1) * 100
+        return summary
@@ -0,0 +1,98 @@
+import logging
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger('bot.circuit_breaker')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream that keeps failing.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls are refused without touching the upstream. Once `reset_timeout`
+    has passed a single probe call is let through (half-open): success closes
+    the circuit, failure re-opens it with the timeout doubled, up to
+    `max_reset_timeout`.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 max_reset_timeout: float = 300.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.next_probe = 0.0
+        self._probing = False
+
+    def is_open(self, now: Optional[float] = None) -> bool:
+        """True while calls are being refused (doesn't use up the probe)"""
+        now = time.monotonic() if now is None else now
+        if self.state == OPEN:
+            return now < self.next_probe
+        return self.state == HALF_OPEN and self._probing
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        """Whether a call may go upstream now; in half-open state only one probe is allowed"""
+        now = time.monotonic() if now is None else now
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if now < self.next_probe:
+                return False
+            self.state = HALF_OPEN
+            self._probing = False
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def record_success(self):
+        if self.state != CLOSED:
+            logger.info(f"Circuit '{self.name}' closed: upstream is healthy again")
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.reset_timeout = self.base_reset_timeout
+        self._probing = False
+
+    def record_failure(self, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            # The probe failed: back off further before the next one
+            self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+            self._open(now)
+        elif self.state == CLOSED and self.failures >= self.failure_threshold:
+            self._open(now)
+
+    def _open(self, now: float):
+        if self.opened_at is None:
+            self.opened_at = time.time()
+            logger.warning(f"Circuit '{self.name}' opened after {self.failures} consecutive failures")
+        self.state = OPEN
+        self._probing = False
+        self.next_probe = now + self.reset_timeout
+
+    def retry_after(self, now: Optional[float] = None) -> float:
+        """Seconds until the next probe (0 when closed)"""
+        now = time.monotonic() if now is None else now
+        if self.state == CLOSED:
+            return 0.0
+        return max(0.0, self.next_probe - now)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened_at": self.opened_at,
+            "retry_after": round(self.retry_after(), 1),
+        }
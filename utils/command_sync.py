@@ -0,0 +1,63 @@
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Optional
+
+import discord
+
+from utils.config import atomic_write_json
+
+logger = logging.getLogger('bot.command_sync')
+
+
+def command_tree_hash(tree: discord.app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> str:
+    """Stable hash of everything Discord stores for the command tree"""
+    payload = [command.to_dict() for command in tree.get_commands(guild=guild)]
+    payload.sort(key=lambda c: (c.get('type', 1), c['name']))
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _load_state(path: str) -> dict:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+async def sync_commands(bot, state_path: str, dev_guild_id: int = 0, force: bool = False) -> bool:
+    """
+    Sync application commands only when the tree has changed.
+    
+    Args:
+        bot: The bot whose command tree should be synced
+        state_path: JSON file holding the last synced hash per scope
+        dev_guild_id: If set, sync to this guild only (instant, for development)
+        force: Sync even if the stored hash matches
+        
+    Returns:
+        True if a sync request was sent to Discord
+    """
+    tree = bot.tree
+    guild = None
+    scope = "global"
+    if dev_guild_id:
+        guild = discord.Object(id=dev_guild_id)
+        tree.copy_global_to(guild=guild)
+        scope = f"guild:{dev_guild_id}"
+
+    digest = command_tree_hash(tree, guild=guild)
+    key = f"{bot.application_id}:{scope}"
+
+    state = await asyncio.to_thread(_load_state, state_path)
+    if not force and state.get(key) == digest:
+        logger.info(f"Application commands unchanged ({scope}), skipping sync")
+        return False
+
+    logger.info(f"Syncing application commands ({scope})...")
+    await tree.sync(guild=guild)
+    state[key] = digest
+    await asyncio.to_thread(atomic_write_json, state_path, state)
+    return True
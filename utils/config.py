@@ -1,72 +1,333 @@
 import os
 import json
+import asyncio
+import logging
+import tempfile
+from dataclasses import dataclass, fields, replace
+from typing import Any, Callable, Dict, List, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger('bot.config')
+
+CONFIG_PATH = 'config.json'
+
+# Keys written back to config.json (secrets stay in the environment)
+SAVED_KEYS = (
+    "server_ip",
+    "cpanel_channel_id",
+    "commands_channel_id",
+    "console_channel_id",
+    "status_channel_id",
+    "admin_category_id",
+    "admin_role_id",
+    "mod_role_id",
+    "owner_id",
+    "temp_vc_category_id",
+    "create_vc_channel_id",
+)
+
+# Only ever read from the environment; config.json can't override these
+SECRET_KEYS = ("token", "minefort_email", "minefort_password")
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def atomic_write_json(path: str, data: Any):
+    """Write JSON to a temp file in the same directory and rename it into place"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Immutable, validated view of the bot configuration"""
+    token: Optional[str] = None
+    minefort_email: Optional[str] = None
+    minefort_password: Optional[str] = None
+    minefort_api_url: str = ''  # Empty = the real API
+    minefort_timeout: float = 10.0
+    minefort_failure_threshold: int = 3  # Consecutive failures before the circuit opens
+    response_deadline: float = 10.0  # Longest a command waits on Minefort before a partial reply
+    server_ip: str = 'fcksociety.minefort.com'
+
+    # Live player counts via Server List Ping (empty address = server_ip)
+    slp_enabled: bool = True
+    slp_address: str = ''
+    # Full roster via UDP Query (needs enable-query=true on the server)
+    query_enabled: bool = False
+    query_address: str = ''
+
+    # Channel IDs
+    cpanel_channel_id: int = 0
+    commands_channel_id: int = 0
+    console_channel_id: int = 0
+    status_channel_id: int = 0
+
+    # Category IDs
+    admin_category_id: int = 0
+
+    # Role IDs
+    admin_role_id: int = 0
+    mod_role_id: int = 0
+
+    # User IDs
+    owner_id: int = 0
+
+    # Voice channel category/channel IDs
+    temp_vc_category_id: int = 0
+    create_vc_channel_id: int = 0
+
+    # Local state (command sync hashes, logs, stats)
+    data_dir: str = 'data'
+
+    # Command sync
+    dev_guild_id: int = 0
+    force_command_sync: bool = False
+
+    # Console channel
+    console_command_concurrency: int = 3  # Servers sent to at once; each server's commands stay in order
+    console_stream: bool = False
+    console_log_max_lines: int = 50000
+
+    # Auto-hibernate
+    auto_hibernate: bool = False
+    idle_empty_samples: int = 15  # Poll intervals (a minute each) a server must stay empty
+    idle_grace_seconds: int = 600
+
+    # Voice time analytics
+    voice_stats: bool = True
+    voice_flush_interval: int = 60  # Seconds between batched writes to SQLite
+
+    # Diagnostics
+    loop_slow_threshold_ms: int = 100
+
+    # Gateway intents and member cache ('full' or 'lean'; needs a restart)
+    runtime_profile: str = 'full'
+    slash_only: bool = False  # Skip prefix command parsing (needs a restart)
+
+    @classmethod
+    def from_env(cls) -> 'ConfigSnapshot':
+        """Build a snapshot from .env file or environment variables"""
+        return cls(
+            token=os.getenv('DISCORD_TOKEN'),
+            minefort_email=os.getenv('MINEFORT_EMAIL'),
+            minefort_password=os.getenv('MINEFORT_PASSWORD'),
+            minefort_api_url=os.getenv('MINEFORT_API_URL', ''),
+            minefort_timeout=float(os.getenv('MINEFORT_TIMEOUT', '10')),
+            minefort_failure_threshold=int(os.getenv('MINEFORT_FAILURE_THRESHOLD', '3')),
+            response_deadline=float(os.getenv('RESPONSE_DEADLINE', '10')),
+            server_ip=os.getenv('MINECRAFT_SERVER_IP', 'fcksociety.minefort.com'),
+            slp_enabled=env_flag('SLP_ENABLED', True),
+            slp_address=os.getenv('SLP_ADDRESS', ''),
+            query_enabled=env_flag('QUERY_ENABLED'),
+            query_address=os.getenv('QUERY_ADDRESS', ''),
+            cpanel_channel_id=int(os.getenv('CPANEL_CHANNEL_ID', '0')),
+            commands_channel_id=int(os.getenv('COMMANDS_CHANNEL_ID', '0')),
+            console_channel_id=int(os.getenv('CONSOLE_CHANNEL_ID', '0')),
+            status_channel_id=int(os.getenv('STATUS_CHANNEL_ID', '0')),
+            admin_category_id=int(os.getenv('ADMIN_CATEGORY_ID', '0')),
+            admin_role_id=int(os.getenv('ADMIN_ROLE_ID', '0')),
+            mod_role_id=int(os.getenv('MOD_ROLE_ID', '0')),
+            owner_id=int(os.getenv('OWNER_ID', '0')),
+            temp_vc_category_id=int(os.getenv('TEMP_VC_CATEGORY_ID', '0')),
+            create_vc_channel_id=int(os.getenv('CREATE_VC_CHANNEL_ID', '0')),
+            data_dir=os.getenv('DATA_DIR', 'data'),
+            dev_guild_id=int(os.getenv('DEV_GUILD_ID', '0')),
+            force_command_sync=env_flag('FORCE_COMMAND_SYNC'),
+            console_command_concurrency=int(os.getenv('CONSOLE_COMMAND_CONCURRENCY', '3')),
+            console_stream=env_flag('CONSOLE_STREAM'),
+            console_log_max_lines=int(os.getenv('CONSOLE_LOG_MAX_LINES', '50000')),
+            auto_hibernate=env_flag('AUTO_HIBERNATE'),
+            idle_empty_samples=int(os.getenv('IDLE_EMPTY_SAMPLES', '15')),
+            idle_grace_seconds=int(os.getenv('IDLE_GRACE_SECONDS', '600')),
+            voice_stats=env_flag('VOICE_STATS', True),
+            voice_flush_interval=int(os.getenv('VOICE_FLUSH_INTERVAL', '60')),
+            loop_slow_threshold_ms=int(os.getenv('LOOP_SLOW_THRESHOLD_MS', '100')),
+            runtime_profile=os.getenv('RUNTIME_PROFILE', 'full').lower(),
+            slash_only=env_flag('SLASH_ONLY'),
+        )
+
+    def with_overrides(self, values: Dict[str, Any]) -> 'ConfigSnapshot':
+        """
+        Return a copy with values from config.json applied.
+
+        Unknown keys are ignored, and secrets are skipped with a warning.
+        Raises ValueError if a value has the wrong type.
+        """
+        for key in SECRET_KEYS:
+            if key in values:
+                logger.warning(f"Ignoring '{key}' in {CONFIG_PATH}; secrets are only read from the environment")
+        changes = {}
+        for field in fields(self):
+            if field.name in values and field.name not in SECRET_KEYS:
+                changes[field.name] = self._coerce(field.name, values[field.name], getattr(self, field.name))
+        return replace(self, **changes)
+
+    @staticmethod
+    def _coerce(name: str, value: Any, current: Any) -> Any:
+        if isinstance(current, bool):
+            if isinstance(value, bool):
+                return value
+            if isinstance(value, str):
+                return value.lower() in ('1', 'true', 'yes', 'on')
+            raise ValueError(f"{name} must be a boolean")
+        if isinstance(current, int):
+            if isinstance(value, bool):
+                raise ValueError(f"{name} must be an integer")
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be an integer, got {value!r}")
+        if isinstance(current, float):
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be a number, got {value!r}")
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"{name} must be a string")
+        return value
+
+    def changed_keys(self, other: 'ConfigSnapshot') -> List[str]:
+        return [f.name for f in fields(self) if getattr(self, f.name) != getattr(other, f.name)]
+
+
 class Config:
-    def __init__(self):
-        # Load from .env file or environment variables
-        self.token = os.getenv('DISCORD_TOKEN')
-        self.minefort_email = os.getenv('MINEFORT_EMAIL')
-        self.minefort_password = os.getenv('MINEFORT_PASSWORD')
-        self.server_ip = os.getenv('MINECRAFT_SERVER_IP', 'fcksociety.minefort.com')
-        
-        # Channel IDs
-        self.cpanel_channel_id = int(os.getenv('CPANEL_CHANNEL_ID', '0'))
-        self.commands_channel_id = int(os.getenv('COMMANDS_CHANNEL_ID', '0'))
-        self.console_channel_id = int(os.getenv('CONSOLE_CHANNEL_ID', '0'))
-        self.status_channel_id = int(os.getenv('STATUS_CHANNEL_ID', '0'))  # New
-        
-        # Category IDs
-        self.admin_category_id = int(os.getenv('ADMIN_CATEGORY_ID', '0'))
-        
-        # Role IDs
-        self.admin_role_id = int(os.getenv('ADMIN_ROLE_ID', '0'))
-        self.mod_role_id = int(os.getenv('MOD_ROLE_ID', '0'))
-        
-        # User IDs
-        self.owner_id = int(os.getenv('OWNER_ID', '0'))
-        
-        # Voice channel category/channel IDs
-        self.temp_vc_category_id = int(os.getenv('TEMP_VC_CATEGORY_ID', '0'))
-        self.create_vc_channel_id = int(os.getenv('CREATE_VC_CHANNEL_ID', '0'))
+    """
+    Configuration service.
+
+    Attribute access is forwarded to the current ConfigSnapshot. The snapshot
+    is replaced as a whole whenever config.json changes on disk, so cogs see
+    a consistent set of IDs without a restart.
+    """
+
+    def __init__(self, path: str = CONFIG_PATH):
+        self.path = path
+        self._env_snapshot = ConfigSnapshot.from_env()
+        self._snapshot = self._env_snapshot
+        self._mtime = None
+        self._listeners: List[Callable[[ConfigSnapshot, ConfigSnapshot], None]] = []
+        self._watch_task = None
+
+    def __getattr__(self, name):
+        # Only called for names not found on the service itself
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self._snapshot, name)
+
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        return self._snapshot
+
+    def add_listener(self, callback: Callable[[ConfigSnapshot, ConfigSnapshot], None]):
+        """Register callback(old, new), called after each reload that changes something"""
+        self._listeners.append(callback)
+
+    def _swap(self, new: ConfigSnapshot):
+        old = self._snapshot
+        changed = old.changed_keys(new)
+        if not changed:
+            return
+        self._snapshot = new
+        logger.info(f"Configuration updated, changed: {', '.join(changed)}")
+        for callback in self._listeners:
+            try:
+                callback(old, new)
+            except Exception as e:
+                logger.error(f"Config listener {callback!r} failed: {e}")
 
     def save_config(self):
-        """Save configuration to config.json"""
-        config_dict = {
-            "server_ip": self.server_ip,
-            "cpanel_channel_id": self.cpanel_channel_id,
-            "commands_channel_id": self.commands_channel_id,
-            "console_channel_id": self.console_channel_id,
-            "status_channel_id": self.status_channel_id,
-            "admin_category_id": self.admin_category_id,
-            "admin_role_id": self.admin_role_id,
-            "mod_role_id": self.mod_role_id,
-            "owner_id": self.owner_id,
-            "temp_vc_category_id": self.temp_vc_category_id,
-            "create_vc_channel_id": self.create_vc_channel_id
-        }
-        
-        with open('config.json', 'w') as f:
-            json.dump(config_dict, f, indent=4)
-
-    def load_config(self):
-        """Load configuration from config.json"""
+        """Save configuration to config.json (atomically)"""
+        config_dict = {key: getattr(self._snapshot, key) for key in SAVED_KEYS}
+        atomic_write_json(self.path, config_dict)
         try:
-            with open('config.json', 'r') as f:
-                config = json.load(f)
-                
-                # Update attributes
-                for key, value in config.items():
-                    if hasattr(self, key):
-                        setattr(self, key, value)
-                        
+            self._mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            pass
+
+    async def save_config_async(self):
+        """Save configuration without blocking the event loop"""
+        await asyncio.to_thread(self.save_config)
+
+    def _read_snapshot(self) -> Optional[ConfigSnapshot]:
+        """Parse and validate config.json into a new snapshot, or None if unusable"""
+        try:
+            # Remember the mtime even if the file turns out invalid, so it's only reported once
+            self._mtime = os.stat(self.path).st_mtime_ns
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("config.json must contain a JSON object")
+            return self._env_snapshot.with_overrides(data)
         except FileNotFoundError:
             # Create default config
             self.save_config()
         except json.JSONDecodeError:
-            print("Error: config.json is invalid. Using default values.")
+            logger.error("config.json is invalid. Keeping current values.")
+        except ValueError as e:
+            logger.error(f"config.json failed validation: {e}. Keeping current values.")
+        return None
+
+    def load_config(self) -> bool:
+        """Load configuration from config.json. Returns True if a valid file was applied"""
+        new = self._read_snapshot()
+        if new is None:
+            return False
+        self._swap(new)
+        return True
+
+    async def reload_if_changed(self) -> bool:
+        """Reload config.json if its modification time changed"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._mtime:
+            return False
+        # File I/O happens off the loop; the swap (and listeners) run on it
+        new = await asyncio.to_thread(self._read_snapshot)
+        if new is None:
+            return False
+        self._swap(new)
+        return True
+
+    def start_watching(self, interval: float = 2.0):
+        """Poll config.json for changes in the background"""
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.get_running_loop().create_task(self._watch(interval))
+
+    def stop_watching(self):
+        if self._watch_task:
+            self._watch_task.cancel()
+            self._watch_task = None
+
+    async def _watch(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload_if_changed()
+            except Exception as e:
+                logger.error(f"Error checking config.json for changes: {e}")
+
 
 config = Config()
 config.load_config()
@@ -0,0 +1,113 @@
+import os
+import re
+import threading
+from collections import deque
+from typing import Iterable, List, Tuple
+
+MESSAGE_LIMIT = 2000
+
+
+def new_lines(previous_tail: List[str], lines: List[str], anchor_size: int = 5) -> List[str]:
+    """
+    Return the lines that appeared since the previous poll.
+
+    The console endpoint returns a sliding window of recent output, so the
+    last few lines we already have are located in the new window and
+    everything after them is new. If they can't be found the window has
+    moved past them (or the server restarted) and every line is new.
+    """
+    anchor = previous_tail[-anchor_size:]
+    if not anchor:
+        return lines
+    size = len(anchor)
+    for end in range(len(lines), size - 1, -1):
+        if lines[end - size:end] == anchor:
+            return lines[end:]
+    return lines
+
+
+def chunk_lines(lines: Iterable[str], limit: int = MESSAGE_LIMIT) -> List[str]:
+    """Pack lines into code-block messages that fit Discord's message limit"""
+    overhead = len("```\n\n```")
+    budget = limit - overhead
+    chunks = []
+    current: List[str] = []
+    size = 0
+    for line in lines:
+        # Keep code fences in the log from breaking the block
+        line = line.replace("```", "`\u200b``")[:budget]
+        added = len(line) + (1 if current else 0)
+        if current and size + added > budget:
+            chunks.append("```\n" + "\n".join(current) + "\n```")
+            current, size = [], 0
+            added = len(line)
+        current.append(line)
+        size += added
+    if current:
+        chunks.append("```\n" + "\n".join(current) + "\n```")
+    return chunks
+
+
+class ConsoleRingLog:
+    """
+    Bounded on-disk log of console lines with an in-memory copy for searching.
+
+    Lines are appended to the file as they arrive. Once the file holds twice
+    `max_lines` it is rewritten from the in-memory window, which keeps disk
+    usage bounded without rewriting on every append.
+    """
+
+    def __init__(self, path: str, max_lines: int = 50000):
+        self.path = path
+        self.max_lines = max_lines
+        self.lines = deque(maxlen=max_lines)
+        self.total = 0  # Sequence number of the newest line
+        self._file_lines = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    self.lines.append(line.rstrip('\n'))
+                    self._file_lines += 1
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.total = len(self.lines)
+
+    def tail(self, count: int) -> List[str]:
+        with self._lock:
+            return list(self.lines)[-count:] if count else []
+
+    def append(self, lines: List[str]):
+        """Add lines to memory and disk (blocking; call from a worker thread)"""
+        if not lines:
+            return
+        with self._lock:
+            self.lines.extend(lines)
+            self.total += len(lines)
+            if self._file_lines + len(lines) > self.max_lines * 2:
+                self._compact()
+            else:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write("\n".join(lines) + "\n")
+                self._file_lines += len(lines)
+
+    def _compact(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(self.lines) + "\n")
+        os.replace(tmp_path, self.path)
+        self._file_lines = len(self.lines)
+
+    def search(self, pattern: "re.Pattern", limit: int = 25) -> Tuple[List[Tuple[int, str]], int]:
+        """
+        Return up to `limit` of the newest matching (line number, line) pairs
+        and the total number of matches.
+        """
+        with self._lock:
+            snapshot = list(self.lines)
+            first = self.total - len(snapshot) + 1
+        matches = [(first + i, line) for i, line in enumerate(snapshot) if pattern.search(line)]
+        return matches[-limit:], len(matches)
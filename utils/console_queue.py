@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('bot.console_queue')
+
+SendFunc = Callable[[str, str], Awaitable[Tuple[bool, str]]]
+
+
+class ConsoleCommandQueue:
+    """
+    Ordered pipeline for console commands.
+
+    Each server's commands are sent one at a time in submission order, so
+    dependent lines (`op x` then `gamemode creative x`) arrive in order.
+    `concurrency` only limits how many servers are sent to at once. A single
+    refresh callback runs once the queue has been idle for `debounce`
+    seconds, so a pasted batch triggers one console refresh instead of one
+    per command.
+    """
+
+    def __init__(self, send: SendFunc, on_idle: Callable[[], Awaitable[None]],
+                 concurrency: int = 3, debounce: float = 2.0):
+        self._send = send
+        self._on_idle = on_idle
+        self.debounce = debounce
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._lanes: Dict[str, "asyncio.Queue[Tuple[str, asyncio.Future]]"] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._pending = 0  # Submitted commands not finished yet
+        self._refresh: Optional[asyncio.Task] = None
+
+    def stop(self):
+        """Cancel the workers and every queued command, so no submit() is left waiting"""
+        for task in list(self._workers.values()) + [self._refresh]:
+            if task:
+                task.cancel()
+        for lane in self._lanes.values():
+            while not lane.empty():
+                _, future = lane.get_nowait()
+                future.cancel()
+        self._workers.clear()
+        self._lanes.clear()
+        self._pending = 0
+        self._refresh = None
+
+    async def submit(self, server_id: str, commands: List[str]) -> List[Tuple[str, bool, str]]:
+        """Queue commands and wait for their results, returned in submission order"""
+        loop = asyncio.get_running_loop()
+        lane = self._lanes.setdefault(server_id, asyncio.Queue())
+        futures = []
+        for command in commands:
+            future = loop.create_future()
+            lane.put_nowait((command, future))
+            futures.append(future)
+        self._pending += len(commands)
+
+        worker = self._workers.get(server_id)
+        if worker is None or worker.done():
+            self._workers[server_id] = loop.create_task(self._run(server_id, lane))
+
+        # New work postpones any pending refresh
+        if self._refresh and not self._refresh.done():
+            self._refresh.cancel()
+
+        results = await asyncio.gather(*futures)
+        return [(command, success, message) for command, (success, message) in zip(commands, results)]
+
+    async def _run(self, server_id: str, lane: asyncio.Queue):
+        """Send one server's commands in order, one request at a time"""
+        while not lane.empty():
+            command, future = lane.get_nowait()
+            try:
+                async with self._semaphore:
+                    result = await self._send(server_id, command)
+            except asyncio.CancelledError:
+                future.cancel()  # Stopped mid-send; don't leave submit() waiting
+                raise
+            except Exception as e:
+                result = (False, f"Error sending command: {e}")
+            if not future.done():
+                future.set_result(result)
+            self._pending -= 1
+            self._schedule_refresh()
+        # Nothing awaited since the empty check, so no command can be stranded
+        del self._lanes[server_id]
+        del self._workers[server_id]
+
+    def _schedule_refresh(self):
+        # Only the last command of a batch arms the refresh
+        if self._pending > 0:
+            return
+        if self._refresh and not self._refresh.done():
+            self._refresh.cancel()
+        self._refresh = asyncio.get_running_loop().create_task(self._refresh_later())
+
+    async def _refresh_later(self):
+        await asyncio.sleep(self.debounce)
+        try:
+            # Shielded so a new batch arriving mid-refresh doesn't abort the edit
+            await asyncio.shield(self._on_idle())
+        except Exception as e:
+            logger.error(f"Console refresh after command batch failed: {e}")
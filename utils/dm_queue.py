@@ -0,0 +1,74 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import discord
+
+from utils.rate_limit import RateLimiter
+
+logger = logging.getLogger('bot.dm_queue')
+
+# Opening many DMs in a burst is what Discord's anti-spam looks for
+DMS_PER_WINDOW = 5
+DM_WINDOW = 10.0
+
+
+class DMQueue:
+    """
+    Sends direct messages from a background task at a steady pace.
+
+    Commands enqueue and reply straight away instead of waiting on one DM
+    per member. `on_failure(user, error)` is awaited for a DM that couldn't
+    be delivered (usually DMs turned off).
+    """
+
+    def __init__(self, rate: int = DMS_PER_WINDOW, per: float = DM_WINDOW, maxsize: int = 200):
+        self.limiter = RateLimiter(rate, per)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._worker: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def start(self):
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._worker:
+            self._worker.cancel()
+            self._worker = None
+
+    def send(self, user, on_failure: Optional[Callable[[Any, Exception], Awaitable]] = None, **kwargs) -> bool:
+        """Queue user.send(**kwargs); returns False if the queue is full"""
+        try:
+            self.queue.put_nowait((user, kwargs, on_failure))
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"DM queue is full, dropping a message to {user}")
+            return False
+
+    async def _run(self):
+        while True:
+            user, kwargs, on_failure = await self.queue.get()
+            delay = self.limiter.retry_after('dm')
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.limiter.hit('dm')
+            try:
+                await user.send(**kwargs)
+                self.sent += 1
+            except Exception as e:  # CancelledError isn't an Exception, so stop() still works
+                self.failed += 1
+                # Forbidden (DMs closed) is routine; anything else is worth a log line
+                if not isinstance(e, discord.Forbidden):
+                    logger.error(f"Failed to DM {user}: {e!r}")
+                if on_failure:
+                    try:
+                        await on_failure(user, e)
+                    except Exception as callback_error:
+                        logger.error(f"DM failure callback failed: {callback_error}")
+
+    def report(self) -> Dict[str, Any]:
+        return {"queued": self.queue.qsize(), "sent": self.sent, "failed": self.failed, "dropped": self.dropped}
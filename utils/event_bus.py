@@ -0,0 +1,93 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+
+@dataclass(frozen=True)
+class ServerSnapshot:
+    """The full server list from one Minefort poll"""
+    servers: Tuple[Dict[str, Any], ...]
+    fetched_at: float  # time.time()
+    stale: bool = False  # Minefort is unreachable; this is the last known data
+
+    def get(self, server_id: str) -> Optional[Dict[str, Any]]:
+        return next((s for s in self.servers if s.get('serverId') == server_id), None)
+
+
+@dataclass(frozen=True)
+class StateChanged:
+    """A server's state code differs from the previous snapshot"""
+    server: Dict[str, Any] = field(compare=False)
+    old: int
+    new: int
+
+    @property
+    def server_id(self) -> str:
+        return self.server.get('serverId')
+
+
+class Subscription:
+    """
+    Bounded queue of events for one subscriber.
+
+    When the subscriber falls behind the oldest queued event is dropped, so
+    a slow consumer always sees the most recent state and never blocks the
+    publisher.
+    """
+
+    def __init__(self, name: str, event_types: Tuple[Type, ...], maxsize: int):
+        self.name = name
+        self.event_types = event_types
+        self.dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, maxsize))
+
+    def put(self, event):
+        """Queue an event without blocking, dropping the oldest if full"""
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(event)
+
+    async def get(self):
+        return await self._queue.get()
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+
+class EventBus:
+    """In-process publish/subscribe for server state events"""
+
+    def __init__(self):
+        self._subscriptions: List[Subscription] = []
+        self._latest: Dict[Type, Any] = {}
+        self.published = 0
+
+    def subscribe(self, name: str, *event_types: Type, maxsize: int = 16) -> Subscription:
+        subscription = Subscription(name, event_types, maxsize)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        try:
+            self._subscriptions.remove(subscription)
+        except ValueError:
+            pass
+
+    def publish(self, event):
+        """Deliver an event to every subscriber of its type (never blocks)"""
+        self.published += 1
+        self._latest[type(event)] = event
+        for subscription in self._subscriptions:
+            if isinstance(event, subscription.event_types):
+                subscription.put(event)
+
+    def latest(self, event_type: Type):
+        """The most recently published event of this type, if any"""
+        return self._latest.get(event_type)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {"name": s.name, "pending": s.pending(), "dropped": s.dropped}
+            for s in self._subscriptions
+        ]
@@ -0,0 +1,54 @@
+import time
+from collections import Counter, deque
+from typing import Any, Dict
+
+
+class GatewayStats:
+    """
+    Counts gateway events and relates them to process CPU time.
+
+    `record` is called synchronously for every event, so it only bumps a
+    counter; every `sample_interval` seconds it also stores a
+    (wall time, CPU time, event count) sample. Rates are computed over the
+    samples from the last `window` seconds.
+    """
+
+    def __init__(self, window: float = 60.0, sample_interval: float = 5.0):
+        self.window = window
+        self.sample_interval = sample_interval
+        self.counts: Counter = Counter()
+        self.total = 0
+        self.started = time.monotonic()
+        self._next_sample = 0.0
+        self._samples = deque(maxlen=max(2, int(window / sample_interval) + 1))
+        self._sample(self.started)
+
+    def _sample(self, now: float):
+        self._samples.append((now, time.process_time(), self.total))
+        self._next_sample = now + self.sample_interval
+
+    def record(self, event_type: str):
+        self.counts[event_type] += 1
+        self.total += 1
+        now = time.monotonic()
+        if now >= self._next_sample:
+            self._sample(now)
+
+    def report(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        cpu = time.process_time()
+        first_time, first_cpu, first_total = self._samples[0]
+        elapsed = max(now - first_time, 1e-9)
+        events = self.total - first_total
+        return {
+            "total": self.total,
+            "uptime_s": round(now - self.started),
+            "window_s": round(elapsed),
+            "events_per_sec": round(events / elapsed, 2),
+            # Whole-process CPU, so background work is included in the figure
+            "cpu_ms_per_event": round((cpu - first_cpu) * 1000 / events, 3) if events else None,
+            "top": self.counts.most_common(5),
+        }
+
+
+gateway_stats = GatewayStats()
@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+
+class IdlePolicy:
+    """
+    Decides when a running server with no players should be hibernated.
+
+    Fed with the same server snapshots the status loop already fetches, so it
+    costs no extra API calls. A server is put to sleep once it has been empty
+    for `empty_samples` poll intervals (`sample_interval` seconds each),
+    timed from the first empty sample so forced refreshes between polls
+    can't shorten it. Never within `grace_seconds` of it first being seen
+    running. Samples closer together than `min_interval` are skipped.
+    """
+
+    def __init__(self, empty_samples: int = 15, grace_seconds: float = 600, min_interval: float = 30,
+                 sample_interval: float = 60):
+        self.empty_samples = empty_samples
+        self.grace_seconds = grace_seconds
+        self.min_interval = min_interval
+        self.sample_interval = sample_interval
+        self.empty_since: Dict[str, float] = {}
+        self.running_since: Dict[str, float] = {}
+        self.last_sample: Dict[str, float] = {}
+
+    @property
+    def idle_seconds(self) -> float:
+        """How long a server has to stay empty before it is hibernated"""
+        return self.empty_samples * self.sample_interval
+
+    def reset(self, server_id: str):
+        self.empty_since.pop(server_id, None)
+        self.running_since.pop(server_id, None)
+        self.last_sample.pop(server_id, None)
+
+    def observe(self, server: Dict[str, Any], now: float) -> Optional[float]:
+        """
+        Record a sample; returns how many seconds the server has been empty
+        once it should be hibernated, otherwise None.
+        """
+        server_id = server.get('serverId')
+        if not server_id:
+            return None
+
+        if server.get('state') != 4:  # Only running servers can idle
+            self.reset(server_id)
+            return None
+
+        if now - self.last_sample.get(server_id, float('-inf')) < self.min_interval:
+            return None
+        self.last_sample[server_id] = now
+        running_since = self.running_since.setdefault(server_id, now)
+
+        if server.get('playerCount', 0) > 0 or now - running_since < self.grace_seconds:
+            self.empty_since.pop(server_id, None)
+            return None
+
+        idle = now - self.empty_since.setdefault(server_id, now)
+        if idle >= self.idle_seconds:
+            self.reset(server_id)
+            return idle
+        return None
+
+
+class AuditLog:
+    """Append-only JSON Lines audit log"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, entry: Dict[str, Any]):
+        """Write one entry (blocking; call from a worker thread)"""
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
@@ -0,0 +1,164 @@
+import asyncio
+import inspect
+import logging
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+logger = logging.getLogger('bot.log_events')
+
+
+@dataclass(frozen=True)
+class LogEvent:
+    """Base class for events parsed from console output"""
+    line: str
+
+
+@dataclass(frozen=True)
+class PlayerJoin(LogEvent):
+    player: str
+
+
+@dataclass(frozen=True)
+class PlayerLeave(LogEvent):
+    player: str
+
+
+@dataclass(frozen=True)
+class ChatMessage(LogEvent):
+    player: str
+    message: str
+
+
+@dataclass(frozen=True)
+class PlayerDeath(LogEvent):
+    player: str
+    message: str
+
+
+@dataclass(frozen=True)
+class TpsWarning(LogEvent):
+    ms_behind: int
+    ticks_behind: int
+
+
+@dataclass(frozen=True)
+class ServerCrash(LogEvent):
+    message: str
+
+
+@dataclass(frozen=True)
+class ServerDone(LogEvent):
+    seconds: float
+
+
+PLAYER = r"(?P<player>[A-Za-z0-9_.]{1,16})"
+
+DEATH_VERBS = (
+    r"was (?:slain|shot|killed|blown up|fireballed|pummeled|pricked|squashed|squished|struck|impaled|"
+    r"stung|poked|frozen|burnt|doomed|obliterated|skewered|roasted)",
+    r"drowned", r"died", r"fell", r"hit the ground", r"burned to death", r"went up in flames",
+    r"walked into", r"tried to swim in lava", r"discovered the floor was lava", r"blew up",
+    r"starved to death", r"suffocated", r"withered away", r"froze to death", r"went off with a bang",
+    r"experienced kinetic energy", r"didn't want to live", r"left the confines of this world",
+)
+
+# (event type, pattern, converters for captured fields)
+DEFAULT_PATTERNS: List[Tuple[Type[LogEvent], str, Dict[str, Callable]]] = [
+    (PlayerJoin, PLAYER + r" joined the game", {}),
+    (PlayerLeave, PLAYER + r" left the game", {}),
+    (ChatMessage, r"<" + PLAYER + r"> (?P<message>.*)", {}),
+    (PlayerDeath, r"(?P<message>" + PLAYER + r" (?:" + "|".join(DEATH_VERBS) + r")\b.*)", {}),
+    (TpsWarning, r"Can't keep up! Is the server overloaded\? Running (?P<ms_behind>\d+)ms or (?P<ticks_behind>\d+) ticks behind",
+     {'ms_behind': int, 'ticks_behind': int}),
+    (ServerCrash, r"(?P<message>(?:This crash report has been saved to|Encountered an unexpected exception|"
+                  r"Exception in server tick loop|---- Minecraft Crash Report ----).*)", {}),
+    (ServerDone, r"Done \((?P<seconds>\d+(?:\.\d+)?)s\)!.*", {'seconds': float}),
+]
+
+# "[12:34:56] [Server thread/INFO]: ", "[12:34:56 INFO]: ", "[Not Secure] " ...
+LINE_PREFIX = r"(?:\[[^\]]*\]:? ?)*(?:(?:INFO|WARN|ERROR):? )?"
+
+
+class LogEventEngine:
+    """
+    Parses console lines into typed events with one compiled regex.
+
+    All patterns are merged into a single alternation, so each line is
+    scanned once no matter how many event types exist. The alternative that
+    matched is identified by its outer group index.
+    """
+
+    def __init__(self, patterns: Optional[List[Tuple[Type[LogEvent], str, Dict[str, Callable]]]] = None):
+        self._subscribers: Dict[Type[LogEvent], List[Callable]] = defaultdict(list)
+        self._tasks = set()
+        self.counts: Counter = Counter()
+        self.compile(patterns or DEFAULT_PATTERNS)
+
+    def compile(self, patterns: List[Tuple[Type[LogEvent], str, Dict[str, Callable]]]):
+        alternatives = []
+        for i, (event_type, pattern, _) in enumerate(patterns):
+            # Group names must be unique across the alternation, so prefix them
+            pattern = re.sub(r"\(\?P<(\w+)>", lambda m: f"(?P<e{i}__{m.group(1)}>", pattern)
+            alternatives.append(f"(?P<e{i}>{pattern})")
+        self._regex = re.compile(f"^{LINE_PREFIX}(?:{'|'.join(alternatives)})$")
+
+        # Map outer group index -> (event type, [(group index, field, converter)])
+        self._dispatch = {}
+        index = self._regex.groupindex
+        for i, (event_type, _, converters) in enumerate(patterns):
+            fields = []
+            for name, group in index.items():
+                prefix = f"e{i}__"
+                if name.startswith(prefix):
+                    field = name[len(prefix):]
+                    fields.append((group, field, converters.get(field)))
+            self._dispatch[index[f"e{i}"]] = (event_type, fields)
+
+    def parse(self, line: str) -> Optional[LogEvent]:
+        """Return the event for a single line, or None"""
+        match = self._regex.match(line)
+        if match is None:
+            return None
+        event_type, fields = self._dispatch[match.lastindex]
+        values = {}
+        for group, field, convert in fields:
+            value = match.group(group)
+            values[field] = convert(value) if convert else value
+        return event_type(line=line, **values)
+
+    def subscribe(self, event_type: Type[LogEvent], callback: Callable):
+        """Call callback(event) for events of this type (LogEvent receives everything)"""
+        self._subscribers[event_type].append(callback)
+
+    def unsubscribe(self, event_type: Type[LogEvent], callback: Callable):
+        try:
+            self._subscribers[event_type].remove(callback)
+        except ValueError:
+            pass
+
+    def feed(self, lines: Iterable[str]) -> List[LogEvent]:
+        """Parse new console lines and dispatch the resulting events"""
+        events = []
+        parse = self.parse
+        for line in lines:
+            event = parse(line)
+            if event is not None:
+                events.append(event)
+        for event in events:
+            self.counts[type(event).__name__] += 1
+            self._publish(event)
+        return events
+
+    def _publish(self, event: LogEvent):
+        callbacks = self._subscribers.get(type(event), []) + self._subscribers.get(LogEvent, [])
+        for callback in callbacks:
+            try:
+                result = callback(event)
+                if inspect.isawaitable(result):
+                    task = asyncio.ensure_future(result)
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+            except Exception as e:
+                logger.error(f"Log event subscriber {callback!r} failed on {type(event).__name__}: {e}")
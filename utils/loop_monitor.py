@@ -0,0 +1,182 @@
+import asyncio
+import heapq
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger('bot.loop_monitor')
+
+
+@dataclass(order=True)
+class SlowCallback:
+    """A single event loop step that ran longer than the threshold."""
+    duration: float
+    name: str = field(compare=False)
+    stack: str = field(compare=False)
+    timestamp: float = field(compare=False)
+
+
+class LoopMonitor:
+    """
+    Lightweight, always-on replacement for asyncio debug mode.
+
+    Every callback the loop runs is timed, and a heartbeat task measures how
+    late the loop wakes up (scheduling lag). A watchdog thread grabs the loop
+    thread's stack while a slow step is still running, so the report shows
+    where the loop was actually blocked.
+    """
+
+    def __init__(self, threshold: float = 0.1, sample_interval: float = 0.5, max_records: int = 10):
+        self.threshold = threshold
+        self.sample_interval = sample_interval
+        self.max_records = max_records
+
+        # Scheduling lag statistics (seconds)
+        self.lag_last = 0.0
+        self.lag_max = 0.0
+        self.lag_avg = 0.0
+        self.slow_count = 0
+
+        self._worst: List[SlowCallback] = []  # min-heap of the worst offenders
+        self._recent = deque(maxlen=max_records)
+
+        # State shared with the watchdog thread
+        self._seq = 0
+        self._running = None
+        self._started = 0.0
+        self._stack = None
+        self._stack_seq = -1
+
+        self._original_run = None
+        self._loop_thread_id = None
+        self._sampler = None
+        self._watchdog = None
+        self._stop = threading.Event()
+
+    @property
+    def installed(self) -> bool:
+        return self._original_run is not None
+
+    def install(self, threshold: Optional[float] = None):
+        """Start monitoring the running event loop"""
+        if self.installed:
+            return
+        if threshold is not None:
+            self.threshold = threshold
+
+        self._loop_thread_id = threading.get_ident()
+        self._original_run = asyncio.events.Handle._run
+        original_run = self._original_run
+        monitor = self
+
+        def _run(handle):
+            monitor._seq += 1
+            seq = monitor._seq
+            start = time.perf_counter()
+            monitor._started = start
+            monitor._running = handle
+            try:
+                original_run(handle)
+            finally:
+                monitor._running = None
+                duration = time.perf_counter() - start
+                if duration >= monitor.threshold:
+                    monitor._record(handle, duration, seq)
+
+        asyncio.events.Handle._run = _run
+
+        self._stop.clear()
+        self._sampler = asyncio.get_running_loop().create_task(self._sample_lag())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"Loop monitor installed (threshold {self.threshold * 1000:.0f}ms)")
+
+    def uninstall(self):
+        """Stop monitoring and restore the original callback runner"""
+        if not self.installed:
+            return
+        asyncio.events.Handle._run = self._original_run
+        self._original_run = None
+        self._stop.set()
+        if self._sampler:
+            self._sampler.cancel()
+            self._sampler = None
+
+    async def _sample_lag(self):
+        """Measure how late the loop wakes up from a fixed sleep"""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.sample_interval)
+            lag = max(0.0, loop.time() - start - self.sample_interval)
+            self.lag_last = lag
+            self.lag_max = max(self.lag_max, lag)
+            self.lag_avg = lag if not self.lag_avg else self.lag_avg * 0.9 + lag * 0.1
+
+    def _watch(self):
+        """Capture the loop thread's stack while a step overruns the threshold"""
+        while not self._stop.wait(self.threshold / 2):
+            seq = self._seq
+            if self._running is None or self._stack_seq == seq:
+                continue
+            if time.perf_counter() - self._started < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = ''.join(traceback.format_stack(frame))
+            # The step may have finished while we were formatting
+            if self._seq == seq:
+                self._stack = stack
+                self._stack_seq = seq
+
+    def _record(self, handle, duration: float, seq: int):
+        """Log and keep a slow step"""
+        name, suspended_at = self._describe(handle)
+        stack = self._stack if self._stack_seq == seq else suspended_at
+
+        record = SlowCallback(duration, name, stack, time.time())
+        self.slow_count += 1
+        self._recent.append(record)
+        if len(self._worst) < self.max_records:
+            heapq.heappush(self._worst, record)
+        elif record > self._worst[0]:
+            heapq.heapreplace(self._worst, record)
+
+        logger.warning(f"Slow event loop step: {name} blocked for {duration * 1000:.0f}ms\n{stack}")
+
+    @staticmethod
+    def _describe(handle):
+        """Return a readable name for a handle and where its coroutine is parked"""
+        callback = getattr(handle, '_callback', None)
+        task = getattr(callback, '__self__', None)
+        if isinstance(task, asyncio.Task):
+            coro = task.get_coro()
+            name = f"{task.get_name()} ({getattr(coro, '__qualname__', repr(coro))})"
+            frames = task.get_stack(limit=5)
+            stack = ''.join(traceback.format_list(traceback.extract_stack(frames[-1]))) if frames else ''
+            return name, stack
+        return getattr(callback, '__qualname__', repr(callback)), ''
+
+    def worst_offenders(self) -> List[SlowCallback]:
+        return sorted(self._worst, reverse=True)
+
+    def recent(self) -> List[SlowCallback]:
+        return list(reversed(self._recent))
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "lag_last_ms": round(self.lag_last * 1000, 1),
+            "lag_avg_ms": round(self.lag_avg * 1000, 1),
+            "lag_max_ms": round(self.lag_max * 1000, 1),
+            "slow_count": self.slow_count,
+            "threshold_ms": round(self.threshold * 1000),
+        }
+
+
+loop_monitor = LoopMonitor()
@@ -3,17 +3,27 @@ import time
 from typing import Dict, List, Any, Optional, Tuple
 import json
 
+
+class MinefortError(Exception):
+    """Minefort could not be reached or returned an error"""
+
+
 class MinefortAPI:
     """Wrapper for Minefort API to manage Minecraft servers."""
     
     BASE_URL = "https://api.minefort.com/v1"
     
-    def __init__(self, email: str, password: str):
+    def __init__(self, email: str, password: str, base_url: Optional[str] = None, timeout: float = 10.0):
         self.email = email
         self.password = password
+        self.timeout = timeout  # Seconds per request, so a dead upstream can't hang a caller
+        if base_url:  # e.g. a local fake Minefort for testing
+            self.BASE_URL = base_url.rstrip('/')
         self.session = requests.Session()
         self.is_logged_in = False
         self.last_console_log = ""
+        self._servers_etag: Optional[str] = None
+        self._servers: List[Dict[str, Any]] = []
     
     def login(self) -> bool:
         """Log in to the Minefort API."""
@@ -32,7 +42,7 @@ class MinefortAPI:
         }
 
         try:
-            response = self.session.post(login_endpoint, headers=headers, json=payload)
+            response = self.session.post(login_endpoint, headers=headers, json=payload, timeout=self.timeout)
             response.raise_for_status()
             self.is_logged_in = True
             return True
@@ -49,9 +59,16 @@ class MinefortAPI:
         return True
     
     def get_servers(self) -> List[Dict[str, Any]]:
-        """Get the list of user's servers."""
-        if not self.ensure_login():
+        """Get the list of user's servers (empty on failure)."""
+        try:
+            return self.fetch_servers()
+        except MinefortError:
             return []
+    
+    def fetch_servers(self, _retry: bool = True) -> List[Dict[str, Any]]:
+        """Get the list of user's servers, raising MinefortError on failure."""
+        if not self.ensure_login():
+            raise MinefortError("Failed to login to Minefort")
             
         servers_endpoint = f"{self.BASE_URL}/user/servers"
         
@@ -61,18 +78,25 @@ class MinefortAPI:
             "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36",
         }
 
+        if self._servers_etag:
+            headers["if-none-match"] = self._servers_etag
+
         try:
-            response = self.session.get(servers_endpoint, headers=headers)
+            response = self.session.get(servers_endpoint, headers=headers, timeout=self.timeout)
+            if response.status_code == 304:  # Unchanged since the last fetch
+                return self._servers
             response.raise_for_status()
             data = response.json()
-            return data.get('result', [])
+            self._servers = data.get('result', [])
+            self._servers_etag = response.headers.get('etag')
+            return self._servers
         except Exception as e:
             # Try to re-login if the session might have expired
             if isinstance(e, requests.exceptions.HTTPError) and e.response.status_code in [401, 403]:
                 self.is_logged_in = False
-                if self.login():
-                    return self.get_servers()  # Retry after login
-            return []
+                if _retry and self.login():
+                    return self.fetch_servers(_retry=False)  # Retry after login
+            raise MinefortError(f"Error fetching servers: {e}") from e
     
     def perform_server_action(self, server_id: str, action: str) -> Tuple[bool, str]:
         """
@@ -102,7 +126,7 @@ class MinefortAPI:
         }
 
         try:
-            response = self.session.post(action_endpoint, headers=headers)
+            response = self.session.post(action_endpoint, headers=headers, timeout=self.timeout)
             response.raise_for_status()
             
             # Parse response
@@ -147,7 +171,7 @@ class MinefortAPI:
         }
 
         try:
-            response = self.session.get(console_endpoint, headers=headers)
+            response = self.session.get(console_endpoint, headers=headers, timeout=self.timeout)
             response.raise_for_status()
             
             json_response = response.json()
@@ -187,7 +211,7 @@ class MinefortAPI:
         }
 
         try:
-            response = self.session.post(command_endpoint, headers=headers, json=payload)
+            response = self.session.post(command_endpoint, headers=headers, json=payload, timeout=self.timeout)
             response.raise_for_status()
             
             return True, f"Command '{command}' sent successfully"
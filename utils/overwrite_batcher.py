@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+import discord
+
+from utils.rate_limit import RateLimiter
+
+logger = logging.getLogger('bot.overwrite_batcher')
+
+# Budget for channel edits, kept under Discord's per-channel limit for PATCH /channels/{id}
+EDITS_PER_CHANNEL = 5
+EDIT_WINDOW = 10.0
+
+
+class _Batch:
+    def __init__(self, channel):
+        self.channel = channel
+        self.changes: Dict[int, Any] = {}  # target ID -> (target, {permission: value})
+        self.done = asyncio.get_running_loop().create_future()
+        # Mark a failure as seen even if every waiter has gone away
+        self.done.add_done_callback(lambda future: future.cancelled() or future.exception())
+        self.task: Optional[asyncio.Task] = None
+
+
+class OverwriteBatcher:
+    """
+    Merges permission overwrite changes into one channel.edit() per channel.
+
+    Changes arriving within `window` seconds of each other (e.g. a lock and
+    an 8-member invite) go out as a single edit. While a channel has no edit
+    headroom left, changes keep merging into the pending batch until it does.
+
+    Edits to one channel go out one at a time, each built on the channel the
+    previous edit returned: the cached overwrites only catch up once the
+    gateway's CHANNEL_UPDATE arrives, so building from the cache could undo
+    an edit still in flight.
+    """
+
+    def __init__(self, window: float = 0.25, rate: int = EDITS_PER_CHANNEL, per: float = EDIT_WINDOW):
+        self.window = window
+        self.rate = rate
+        self.limiter = RateLimiter(rate, per)
+        self._pending: Dict[int, _Batch] = {}
+        self._inflight: Dict[int, asyncio.Task] = {}  # channel ID -> latest flush, resolves to the edited channel
+        self.changes = 0
+        self.edits = 0
+        self.throttled = 0
+
+    async def update(self, channel, target, **permissions: Optional[bool]):
+        """Change target's overwrite on channel; returns once the merged edit has been made"""
+        batch = self._pending.get(channel.id)
+        if batch is None:
+            batch = self._pending[channel.id] = _Batch(channel)
+            batch.task = asyncio.ensure_future(self._flush_later(batch))
+        _, merged = batch.changes.setdefault(target.id, (target, {}))
+        merged.update(permissions)
+        self.changes += 1
+        await asyncio.shield(batch.done)
+
+    def headroom(self, channel_id: int) -> int:
+        """Edits left in the current window for a channel"""
+        return self.limiter.remaining(channel_id)
+
+    async def _flush_later(self, batch: _Batch):
+        await asyncio.sleep(self.window)
+        channel_id = batch.channel.id
+        previous = self._inflight.get(channel_id)
+        self._inflight[channel_id] = asyncio.current_task()
+        channel = batch.channel
+        try:
+            if previous:
+                # Changes keep merging into this batch while the previous edit finishes
+                await asyncio.wait({previous})
+                if not previous.cancelled() and previous.exception() is None:
+                    channel = previous.result() or channel
+            delay = self.limiter.retry_after(channel_id)
+            if delay > 0:
+                self.throttled += 1
+                logger.info(f"Channel {channel_id} is out of edit headroom, holding changes for {delay:.1f}s")
+                await asyncio.sleep(delay)
+            # Later changes start a new batch from here on
+            self._pending.pop(channel_id, None)
+            try:
+                edited = await self._edit(channel, batch)
+            except Exception as e:
+                batch.done.set_exception(e)
+                return channel
+            batch.done.set_result(None)
+            return edited or channel
+        finally:
+            if self._inflight.get(channel_id) is asyncio.current_task():
+                del self._inflight[channel_id]
+
+    async def _edit(self, channel, batch: _Batch):
+        # Key by ID: cached overwrites may use discord.Object for uncached members
+        overwrites = {target.id: (target, overwrite) for target, overwrite in channel.overwrites.items()}
+        for target_id, (target, permissions) in batch.changes.items():
+            _, current = overwrites.get(target_id, (target, discord.PermissionOverwrite()))
+            overwrite = discord.PermissionOverwrite.from_pair(*current.pair())
+            overwrite.update(**permissions)
+            overwrites[target_id] = (target, overwrite)
+        self.limiter.hit(channel.id)
+        self.edits += 1
+        return await channel.edit(overwrites=dict(overwrites.values()))
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "changes": self.changes,
+            "edits": self.edits,
+            "throttled": self.throttled,
+            "pending": len(self._pending),
+        }
@@ -0,0 +1,133 @@
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Tuple
+
+import discord
+from discord.ext import commands
+
+from utils.config import config, ConfigSnapshot
+
+
+class WrongChannel(commands.CheckFailure):
+    """Command used outside the channel it is restricted to"""
+
+
+class NotStaff(commands.CheckFailure):
+    """Member has neither the admin nor the moderator role"""
+
+
+class NotServerOwner(commands.CheckFailure):
+    """User is not the configured owner"""
+
+
+CHANNEL_NAMES = {
+    'commands': "commands",
+    'cpanel': "cPanel",
+    'console': "console",
+}
+
+
+class AccessPolicy:
+    """
+    Precomputed authorization data built from the config snapshot.
+
+    Role and channel IDs are kept in frozensets, and the staff decision is
+    cached per member until their roles change (or the entry expires, for
+    setups that don't receive member update events).
+    """
+
+    def __init__(self, snapshot: ConfigSnapshot, cache_size: int = 2048, cache_ttl: float = 600.0):
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._staff_cache: "OrderedDict[Tuple[int, int], Tuple[bool, float]]" = OrderedDict()
+        self.rebuild(snapshot)
+
+    def rebuild(self, snapshot: ConfigSnapshot):
+        """Recompute the ID sets (called whenever the config changes)"""
+        self.owner_id = snapshot.owner_id
+        self.staff_role_ids: FrozenSet[int] = frozenset(
+            role_id for role_id in (snapshot.admin_role_id, snapshot.mod_role_id) if role_id
+        )
+        self.channel_ids: Dict[str, FrozenSet[int]] = {
+            name: frozenset({getattr(snapshot, f"{name}_channel_id")}) for name in CHANNEL_NAMES
+        }
+        self._staff_cache.clear()
+
+    def is_owner(self, user) -> bool:
+        return user.id == self.owner_id
+
+    def in_channel(self, channel_id: int, name: str) -> bool:
+        return channel_id in self.channel_ids[name]
+
+    def is_staff(self, member) -> bool:
+        """Check if member has the admin or moderator role"""
+        roles = getattr(member, 'roles', None)
+        if roles is None:  # Not a guild member (e.g. DMs)
+            return False
+
+        key = (member.guild.id, member.id)
+        now = time.monotonic()
+        cached = self._staff_cache.get(key)
+        if cached is not None and now - cached[1] < self.cache_ttl:
+            return cached[0]
+
+        allowed = not self.staff_role_ids.isdisjoint(role.id for role in roles)
+        self._staff_cache[key] = (allowed, now)
+        self._staff_cache.move_to_end(key)
+        if len(self._staff_cache) > self.cache_size:
+            self._staff_cache.popitem(last=False)
+        return allowed
+
+    def invalidate(self, guild_id: int, member_id: int):
+        """Forget the cached decision for a member (their roles changed)"""
+        self._staff_cache.pop((guild_id, member_id), None)
+
+
+access = AccessPolicy(config.snapshot)
+config.add_listener(lambda old, new: access.rebuild(new))
+
+
+def in_channel(name: str):
+    """Restrict a command to one of the configured channels"""
+    async def predicate(ctx):
+        if access.in_channel(ctx.channel.id, name):
+            return True
+        raise WrongChannel(f"❌ This command can only be used in the {CHANNEL_NAMES[name]} channel.")
+    return commands.check(predicate)
+
+
+async def resolve_member(ctx):
+    """
+    The invoking user as a guild Member with roles.
+
+    Without the members intent the member cache only holds people in voice,
+    so fall back to fetching the member from the API.
+    """
+    author = ctx.author
+    if ctx.guild is None or isinstance(author, discord.Member):
+        return author
+    member = ctx.guild.get_member(author.id)
+    if member is None:
+        try:
+            member = await ctx.guild.fetch_member(author.id)
+        except discord.HTTPException:
+            return author
+    return member
+
+
+def staff_only():
+    """Restrict a command to members with the admin or moderator role"""
+    async def predicate(ctx):
+        if access.is_staff(await resolve_member(ctx)):
+            return True
+        raise NotStaff("❌ You need the Admin or Moderator role to use this command.")
+    return commands.check(predicate)
+
+
+def owner_only():
+    """Restrict a command to the configured owner"""
+    async def predicate(ctx):
+        if access.is_owner(ctx.author):
+            return True
+        raise NotServerOwner("❌ Only the bot owner can use this command.")
+    return commands.check(predicate)
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import random
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from utils.slp import DEFAULT_PORT, parse_address
+
+logger = logging.getLogger('bot.query')
+
+MAGIC = b'\xfe\xfd'
+HANDSHAKE = 9
+STAT = 0
+# Servers rotate challenge tokens every 30 seconds
+TOKEN_TTL = 25.0
+
+# Fixed filler around the key/value section of a full stat response
+STAT_PADDING = b'splitnum\x00\x80\x00'
+PLAYERS_PADDING = b'\x01player_\x00\x00'
+
+
+def session_id() -> int:
+    """Random session ID (servers only keep the low 4 bits of each byte)"""
+    return random.getrandbits(32) & 0x0F0F0F0F
+
+
+def handshake_request(session: int) -> bytes:
+    return MAGIC + struct.pack('>Bi', HANDSHAKE, session)
+
+
+def stat_request(session: int, token: int) -> bytes:
+    """Full stat request (the 4 padding bytes ask for the full rather than basic stat)"""
+    return MAGIC + struct.pack('>Bii', STAT, session, token) + b'\x00' * 4
+
+
+def parse_header(data: bytes) -> Tuple[int, int, bytes]:
+    """Split a response into (type, session ID, payload)"""
+    if len(data) < 5:
+        raise ValueError("Truncated response")
+    packet_type, session = struct.unpack('>Bi', data[:5])
+    return packet_type, session, data[5:]
+
+
+def parse_token(payload: bytes) -> int:
+    return int(payload.split(b'\x00', 1)[0])
+
+
+def parse_full_stat(payload: bytes) -> Tuple[Dict[str, str], List[str]]:
+    """Key/values and player names from a full stat payload"""
+    if not payload.startswith(STAT_PADDING):
+        raise ValueError("Not a full stat response")
+    kv_section, sep, players_section = payload[len(STAT_PADDING):].partition(PLAYERS_PADDING)
+    if not sep:
+        raise ValueError("Missing player section")
+    parts = kv_section.split(b'\x00')
+    values = {}
+    for i in range(0, len(parts) - 1, 2):
+        if not parts[i]:
+            break
+        values[parts[i].decode('utf-8', 'replace')] = parts[i + 1].decode('utf-8', 'replace')
+    players = [name.decode('utf-8', 'replace') for name in players_section.split(b'\x00') if name]
+    return values, players
+
+
+def parse_plugins(value: str) -> Tuple[str, List[str]]:
+    """'Paper on 1.20.4: EssentialsX 2.20; LuckPerms 5.4' -> (server software, plugins)"""
+    software, _, plugins = value.partition(':')
+    return software.strip(), [plugin.strip() for plugin in plugins.split(';') if plugin.strip()]
+
+
+@dataclass(frozen=True)
+class QueryStatus:
+    """A Query full stat: the whole player roster plus server details"""
+    motd: str
+    game_type: str
+    version: str
+    map: str
+    online: int
+    max_players: int
+    players: List[str] = field(default_factory=list)
+    software: str = ""
+    plugins: List[str] = field(default_factory=list)
+    fetched_at: float = 0.0
+
+    @classmethod
+    def from_stat(cls, values: Dict[str, str], players: List[str]) -> 'QueryStatus':
+        software, plugins = parse_plugins(values.get('plugins', ''))
+        return cls(
+            motd=values.get('hostname', ''),
+            game_type=values.get('gametype', ''),
+            version=values.get('version', ''),
+            map=values.get('map', ''),
+            online=int(values.get('numplayers', len(players)) or 0),
+            max_players=int(values.get('maxplayers', 0) or 0),
+            players=players,
+            software=software,
+            plugins=plugins,
+            fetched_at=time.time(),
+        )
+
+    def to_dict(self) -> Dict:
+        """The details merged into a server in the shared snapshot"""
+        return {
+            "motd": self.motd,
+            "version": self.version,
+            "map": self.map,
+            "software": self.software,
+            "plugins": list(self.plugins),
+        }
+
+
+class _QueryProtocol(asyncio.DatagramProtocol):
+    """Hands each datagram to whoever is waiting for the next one"""
+
+    def __init__(self):
+        self.waiter: Optional[asyncio.Future] = None
+
+    def datagram_received(self, data, addr):
+        if self.waiter and not self.waiter.done():
+            self.waiter.set_result(data)
+
+    def error_received(self, exc):
+        if self.waiter and not self.waiter.done():
+            self.waiter.set_exception(exc)
+
+
+class QueryClient:
+    """
+    Minecraft Query (UDP) client for one address; the server needs enable-query=true.
+
+    The challenge token from the handshake is reused until shortly before the
+    server rotates it, so most queries are a single round trip. Results are
+    cached for `ttl` seconds (failures for `failure_ttl`) and concurrent
+    callers share one in-flight query.
+    """
+
+    def __init__(self, address: str, ttl: float = 10.0, failure_ttl: float = 30.0, timeout: float = 2.0):
+        self.address = address
+        self.host, self.port = parse_address(address, DEFAULT_PORT)
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.timeout = timeout
+        self._token: Optional[int] = None
+        self._token_expires = 0.0
+        self._result: Optional[QueryStatus] = None
+        self._expires = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+        self.queries = 0
+        self.handshakes = 0
+        self.failures = 0
+
+    async def full_stat(self) -> Optional[QueryStatus]:
+        """The server's full stat, or None if it doesn't answer queries right now"""
+        if time.monotonic() < self._expires:
+            return self._result
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._refresh())
+        return await asyncio.shield(self._inflight)
+
+    def invalidate(self):
+        """Forget the cached result (the challenge token is kept)"""
+        self._expires = 0.0
+
+    async def _refresh(self) -> Optional[QueryStatus]:
+        self.queries += 1
+        try:
+            self._result = await self._query()
+            self._expires = time.monotonic() + self.ttl
+        except (OSError, asyncio.TimeoutError, ValueError) as e:
+            self.failures += 1
+            logger.debug(f"Query to {self.host}:{self.port} failed: {e!r}")
+            self._result = None
+            self._expires = time.monotonic() + self.failure_ttl
+        return self._result
+
+    async def _query(self) -> QueryStatus:
+        loop = asyncio.get_running_loop()
+        transport, protocol = await loop.create_datagram_endpoint(
+            _QueryProtocol, remote_addr=(self.host, self.port))
+        try:
+            session = session_id()
+            cached = self._token is not None and time.monotonic() < self._token_expires
+            if not cached:
+                await self._handshake(transport, protocol, session)
+            try:
+                payload = await self._request(transport, protocol, stat_request(session, self._token), STAT, session)
+            except asyncio.TimeoutError:
+                if not cached:
+                    raise
+                # Servers silently ignore a stale token: get a new one and try once more
+                await self._handshake(transport, protocol, session)
+                payload = await self._request(transport, protocol, stat_request(session, self._token), STAT, session)
+            return QueryStatus.from_stat(*parse_full_stat(payload))
+        finally:
+            transport.close()
+
+    async def _handshake(self, transport, protocol, session: int):
+        self.handshakes += 1
+        payload = await self._request(transport, protocol, handshake_request(session), HANDSHAKE, session)
+        self._token = parse_token(payload)
+        self._token_expires = time.monotonic() + TOKEN_TTL
+
+    async def _request(self, transport, protocol, request: bytes, packet_type: int, session: int) -> bytes:
+        deadline = time.monotonic() + self.timeout
+        transport.sendto(request)
+        while True:
+            protocol.waiter = asyncio.get_running_loop().create_future()
+            data = await asyncio.wait_for(protocol.waiter, max(0.0, deadline - time.monotonic()))
+            response_type, response_session, payload = parse_header(data)
+            # Ignore late answers to an earlier request
+            if response_type == packet_type and response_session == session:
+                return payload
@@ -0,0 +1,35 @@
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, Hashable, Optional
+
+
+class RateLimiter:
+    """Sliding-window rate limiter keyed by any hashable (user ID, guild ID, ...)"""
+
+    def __init__(self, rate: int, per: float):
+        self.rate = rate
+        self.per = per
+        self._hits: Dict[Hashable, Deque[float]] = defaultdict(deque)
+
+    def retry_after(self, key: Hashable, now: Optional[float] = None) -> float:
+        """Seconds until key may act again (0 if it may act now)"""
+        now = time.monotonic() if now is None else now
+        hits = self._hits.get(key)
+        if not hits:
+            return 0.0
+        while hits and now - hits[0] >= self.per:
+            hits.popleft()
+        if not hits:
+            del self._hits[key]
+            return 0.0
+        if len(hits) < self.rate:
+            return 0.0
+        return self.per - (now - hits[0])
+
+    def remaining(self, key: Hashable, now: Optional[float] = None) -> int:
+        """How many more times key may act in the current window"""
+        self.retry_after(key, now)  # Drops expired hits
+        return max(0, self.rate - len(self._hits.get(key, ())))
+
+    def hit(self, key: Hashable, now: Optional[float] = None):
+        self._hits[key].append(time.monotonic() if now is None else now)
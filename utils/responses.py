@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Dict, Optional, Tuple
+
+from discord.ext import commands
+
+logger = logging.getLogger('bot.responses')
+
+# Discord drops an interaction that isn't acknowledged within 3 seconds;
+# leave a margin for the defer request itself
+DEFER_AFTER = 2.0
+
+
+class ResponseStats:
+    """Rolling time-to-first-response samples, with p50/p99 logged every `log_every` responses"""
+
+    def __init__(self, size: int = 500, log_every: int = 50):
+        self.samples = deque(maxlen=size)
+        self.log_every = log_every
+        self.count = 0
+
+    def record(self, seconds: float, command: Optional[str] = None):
+        self.samples.append(seconds)
+        self.count += 1
+        if self.count % self.log_every == 0:
+            report = self.report()
+            logger.info(f"Time to first response over the last {report['samples']} commands: "
+                        f"p50 {report['p50_ms']}ms, p99 {report['p99_ms']}ms")
+        if seconds > DEFER_AFTER:
+            logger.warning(f"Command '{command}' took {seconds * 1000:.0f}ms to respond")
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def report(self) -> Dict[str, Any]:
+        p50, p99 = self.percentile(0.50), self.percentile(0.99)
+        return {
+            "samples": len(self.samples),
+            "p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "p99_ms": round(p99 * 1000) if p99 is not None else None,
+        }
+
+
+response_stats = ResponseStats()
+
+
+class TimedContext(commands.Context):
+    """Context that records how long the bot took to first reply or defer"""
+
+    def __init__(self, **attrs):
+        super().__init__(**attrs)
+        self.received = time.monotonic()
+        self.responded = False
+
+    def _mark_response(self):
+        if not self.responded:
+            self.responded = True
+            response_stats.record(time.monotonic() - self.received, self.command and self.command.qualified_name)
+
+    async def defer(self, *, ephemeral: bool = False) -> None:
+        self._mark_response()
+        await super().defer(ephemeral=ephemeral)
+
+    async def send(self, *args, **kwargs):
+        self._mark_response()
+        return await super().send(*args, **kwargs)
+
+    @property
+    def deferred(self) -> bool:
+        return self.interaction is not None and self.interaction.response.is_done()
+
+
+async def run_with_deadline(ctx: commands.Context, work: Awaitable, deadline: float,
+                            defer_after: float = DEFER_AFTER, ephemeral: bool = False) -> Tuple[bool, Any]:
+    """
+    Await upstream work for a command reply.
+
+    The interaction is only deferred if the work outlasts `defer_after`, so
+    quick answers go out as the initial response. If it is still running at
+    `deadline` the wait is cancelled and (False, None) is returned so the
+    caller can send a partial reply while the token is still valid.
+
+    Pass `ephemeral=True` if the replies are ephemeral: the first follow-up
+    takes over the deferred response and keeps its visibility.
+    """
+    task = asyncio.ensure_future(work)
+    done, _ = await asyncio.wait({task}, timeout=defer_after)
+    if not done:
+        if not getattr(ctx, 'deferred', False):
+            await ctx.defer(ephemeral=ephemeral)
+        done, _ = await asyncio.wait({task}, timeout=max(0.0, deadline - defer_after))
+    if not done:
+        task.cancel()
+        return False, None
+    return True, task.result()
@@ -0,0 +1,98 @@
+import json
+import logging
+import os
+import time
+from typing import Any, Dict
+
+import discord
+
+from utils.config import atomic_write_json
+
+logger = logging.getLogger('bot.runtime_profile')
+
+PROFILES = ('full', 'lean')
+
+
+def gateway_options(profile: str, slash_only: bool = False, console_input: bool = True) -> Dict[str, Any]:
+    """
+    Intents and cache settings for a runtime profile.
+
+    'full' subscribes to member events and chunks every guild at startup.
+    'lean' drops the privileged members intent and only caches members that
+    are in voice, which is all the voice cog needs; permission checks fetch
+    anyone else on demand.
+
+    In slash-only mode message events are only needed for typed console
+    input, so without a console channel they aren't subscribed to at all.
+    """
+    if profile not in PROFILES:
+        logger.warning(f"Unknown runtime profile '{profile}', using 'full'")
+        profile = 'full'
+
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.voice_states = True  # Required for voice channel features
+    if slash_only:
+        intents.message_content = console_input
+        intents.guild_messages = console_input
+        intents.dm_messages = False
+
+    if profile == 'lean':
+        intents.members = False
+        member_cache_flags = discord.MemberCacheFlags.none()
+        member_cache_flags.voice = True
+        return {
+            'intents': intents,
+            'member_cache_flags': member_cache_flags,
+            'chunk_guilds_at_startup': False,
+        }
+
+    intents.members = True
+    return {
+        'intents': intents,
+        'member_cache_flags': discord.MemberCacheFlags.from_intents(intents),
+        'chunk_guilds_at_startup': True,
+    }
+
+
+def rss_bytes() -> int:
+    """Current resident set size (falls back to the peak where /proc isn't available)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource  # Unix only
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+
+def measure(bot, profile: str, ready_ms: int) -> Dict[str, Any]:
+    return {
+        "profile": profile,
+        "rss_mb": round(rss_bytes() / (1024 * 1024), 1),
+        "members_cached": sum(len(guild.members) for guild in bot.guilds),
+        "member_counts": sum(guild.member_count or 0 for guild in bot.guilds),
+        "guilds": len(bot.guilds),
+        "ready_ms": ready_ms,
+        "recorded": int(time.time()),
+    }
+
+
+class ProfileReport:
+    """Latest memory/startup measurement for each runtime profile, kept on disk for comparison"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def record(self, measurement: Dict[str, Any]):
+        """Store a measurement under its profile (blocking; call from a worker thread)"""
+        data = self.load()
+        data[measurement["profile"]] = measurement
+        atomic_write_json(self.path, data)
@@ -0,0 +1,196 @@
+import asyncio
+import json
+import logging
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger('bot.slp')
+
+DEFAULT_PORT = 25565
+MAX_PACKET = 2 * 1024 * 1024  # Protocol limit for a status response (favicons make it large)
+MAX_CONCURRENT_PINGS = 4  # Shared by every client in the process
+
+_ping_slots = asyncio.Semaphore(MAX_CONCURRENT_PINGS)
+
+
+def parse_address(address: str, default_port: int = DEFAULT_PORT) -> Tuple[str, int]:
+    """Split 'host[:port]' into (host, port)"""
+    host, sep, port = address.strip().rpartition(':')
+    if sep and port.isdigit() and ']' not in port:
+        return host.strip('[]'), int(port)
+    return address.strip().strip('[]'), default_port
+
+
+def encode_varint(value: int) -> bytes:
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def decode_varint(data: bytes, offset: int = 0) -> Tuple[int, int]:
+    """Decode a VarInt from data at offset, returning (value, new offset)"""
+    result = 0
+    for i in range(5):
+        if offset >= len(data):
+            raise ValueError("Truncated VarInt")
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << (7 * i)
+        if not byte & 0x80:
+            if result & 0x80000000:
+                result -= 1 << 32
+            return result, offset
+    raise ValueError("VarInt is too long")
+
+
+async def read_varint(reader: asyncio.StreamReader) -> int:
+    result = 0
+    for i in range(5):
+        byte = (await reader.readexactly(1))[0]
+        result |= (byte & 0x7F) << (7 * i)
+        if not byte & 0x80:
+            return result
+    raise ValueError("VarInt is too long")
+
+
+def encode_string(value: str) -> bytes:
+    data = value.encode('utf-8')
+    return encode_varint(len(data)) + data
+
+
+def packet(packet_id: int, payload: bytes = b"") -> bytes:
+    body = encode_varint(packet_id) + payload
+    return encode_varint(len(body)) + body
+
+
+async def read_packet(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    """Read one length-prefixed packet, returning (packet id, payload)"""
+    length = await read_varint(reader)
+    if length <= 0 or length > MAX_PACKET:
+        raise ValueError(f"Bad packet length {length}")
+    body = await reader.readexactly(length)
+    packet_id, offset = decode_varint(body)
+    return packet_id, body[offset:]
+
+
+def handshake(host: str, port: int, protocol: int = -1) -> bytes:
+    """Handshake asking for the status state (protocol -1 = any version)"""
+    return packet(0x00, encode_varint(protocol) + encode_string(host) + struct.pack('>H', port) + encode_varint(1))
+
+
+def motd_text(description) -> str:
+    """Flatten a chat component (or plain string) to text"""
+    if isinstance(description, str):
+        return description
+    if not isinstance(description, dict):
+        return ""
+    text = description.get('text', '')
+    for extra in description.get('extra', []):
+        text += motd_text(extra)
+    return text
+
+
+@dataclass(frozen=True)
+class ServerListStatus:
+    """What a Minecraft server reports in its Server List Ping response"""
+    online: int
+    max_players: int
+    sample: List[str] = field(default_factory=list)  # Up to ~12 names, servers may hide them
+    version: str = ""
+    motd: str = ""
+    latency_ms: float = 0.0
+    fetched_at: float = 0.0
+
+    @classmethod
+    def from_json(cls, data: dict, latency_ms: float) -> 'ServerListStatus':
+        players = data.get('players') or {}
+        return cls(
+            online=int(players.get('online', 0)),
+            max_players=int(players.get('max', 0)),
+            sample=[p.get('name', '') for p in players.get('sample') or [] if p.get('name')],
+            version=(data.get('version') or {}).get('name', ''),
+            motd=motd_text(data.get('description', '')),
+            latency_ms=latency_ms,
+            fetched_at=time.time(),
+        )
+
+
+async def ping(host: str, port: int = DEFAULT_PORT, timeout: float = 3.0) -> ServerListStatus:
+    """One Server List Ping: handshake, status request, status response"""
+    async def exchange():
+        start = time.perf_counter()
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            writer.write(handshake(host, port) + packet(0x00))
+            await writer.drain()
+            packet_id, payload = await read_packet(reader)
+            if packet_id != 0x00:
+                raise ValueError(f"Unexpected packet 0x{packet_id:02x}")
+            length, offset = decode_varint(payload)
+            data = json.loads(payload[offset:offset + length].decode('utf-8'))
+            return ServerListStatus.from_json(data, (time.perf_counter() - start) * 1000)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    return await asyncio.wait_for(exchange(), timeout)
+
+
+class SLPClient:
+    """
+    Cached Server List Ping for one address.
+
+    A result is reused for `ttl` seconds (failures for `failure_ttl`) and
+    callers arriving while a ping is in flight share it, so an address is
+    never pinged more than once at a time. Across addresses at most
+    MAX_CONCURRENT_PINGS connections are open.
+    """
+
+    def __init__(self, address: str, ttl: float = 10.0, failure_ttl: float = 30.0, timeout: float = 2.0):
+        self.address = address
+        self.host, self.port = parse_address(address)
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.timeout = timeout
+        self._result: Optional[ServerListStatus] = None
+        self._expires = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+        self.pings = 0
+        self.failures = 0
+
+    async def status(self) -> Optional[ServerListStatus]:
+        """The server's status, or None if it can't be pinged right now"""
+        if time.monotonic() < self._expires:
+            return self._result
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._refresh())
+        return await asyncio.shield(self._inflight)
+
+    async def _refresh(self) -> Optional[ServerListStatus]:
+        async with _ping_slots:
+            self.pings += 1
+            try:
+                self._result = await ping(self.host, self.port, self.timeout)
+                self._expires = time.monotonic() + self.ttl
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+                self.failures += 1
+                logger.debug(f"Server List Ping to {self.host}:{self.port} failed: {e!r}")
+                self._result = None
+                self._expires = time.monotonic() + self.failure_ttl
+            return self._result
+
+    def invalidate(self):
+        """Forget the cached result (e.g. after the server changed state)"""
+        self._expires = 0.0
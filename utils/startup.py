@@ -0,0 +1,46 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+logger = logging.getLogger('bot.startup')
+
+
+class StartupTimer:
+    """Records how long each startup phase takes, measured from process launch"""
+
+    def __init__(self):
+        self.launched = time.perf_counter()
+        self.phases: Dict[str, float] = {}      # phase name -> duration (seconds)
+        self.milestones: Dict[str, float] = {}  # milestone name -> seconds since launch
+
+    def since_launch(self) -> float:
+        return time.perf_counter() - self.launched
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block of startup work"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.phases[name] = duration
+            logger.info(f"Startup phase '{name}' took {duration * 1000:.0f}ms")
+
+    def mark(self, name: str):
+        """Record a milestone; only the first occurrence counts"""
+        if name in self.milestones:
+            return
+        elapsed = self.since_launch()
+        self.milestones[name] = elapsed
+        logger.info(f"Startup milestone '{name}' reached {elapsed * 1000:.0f}ms after launch")
+
+    def report(self) -> Dict[str, Dict[str, int]]:
+        return {
+            "phases_ms": {name: round(value * 1000) for name, value in self.phases.items()},
+            "milestones_ms": {name: round(value * 1000) for name, value in self.milestones.items()},
+        }
+
+
+startup = StartupTimer()
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+STATE_NAMES = {0: "HIBERNATING", 1: "PROCESSING", 3: "STARTING", 4: "RUNNING", 5: "OFFLINE", 8: "STOPPING"}
+
+
+def _encode(data: Dict[str, Any], updated_at: float) -> Tuple[bytes, str]:
+    """Body and ETag; the timestamp is left out of the ETag so unchanged data revalidates"""
+    content = json.dumps(data, separators=(',', ':'), sort_keys=True)
+    body = json.dumps({"updatedAt": int(updated_at), **data}, separators=(',', ':')).encode()
+    return body, '"' + hashlib.sha1(content.encode()).hexdigest()[:20] + '"'
+
+
+def public_view(server: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields of a Minefort server that are safe to publish"""
+    state = server.get('state')
+    return {
+        "id": server.get('serverId'),
+        "name": server.get('serverName'),
+        "state": state,
+        "status": STATE_NAMES.get(state, "UNKNOWN"),
+        "players": server.get('playerCount', 0) if state == 4 else 0,
+        "maxPlayers": server.get('maxPlayers', 0),
+    }
+
+
+class StatusFeed:
+    """
+    Latest server snapshot for the web API, shared between the bot's event
+    loop (writer) and the webserver's threads (readers).
+
+    Response bodies and ETags are built once per snapshot, so serving a
+    request is a dictionary lookup. State and player count changes are kept
+    in a short numbered history for Server-Sent Events clients. Event IDs
+    carry a per-process epoch, so IDs from before a restart are recognised.
+    """
+
+    def __init__(self, history: int = 100):
+        self._cond = threading.Condition()
+        self._servers: Dict[str, Dict[str, Any]] = {}
+        self._all: Optional[Tuple[bytes, str]] = None
+        self._each: Dict[str, Tuple[bytes, str]] = {}
+        self._events = deque(maxlen=history)  # (id, event name, JSON data)
+        self._event_id = 0
+        self.epoch = format(int(time.time()), 'x')
+
+    def update(self, servers: Iterable[Dict[str, Any]], fetched_at: float, stale: bool = False):
+        """Publish a snapshot (called from the bot's event loop)"""
+        views = {view["id"]: view for view in map(public_view, servers) if view["id"]}
+        all_body = _encode({"stale": stale, "servers": list(views.values())}, fetched_at)
+        each = {server_id: _encode({"stale": stale, "server": view}, fetched_at) for server_id, view in views.items()}
+
+        with self._cond:
+            for server_id, view in views.items():
+                old = self._servers.get(server_id)
+                if old is None or old["state"] != view["state"]:
+                    self._push("state", view)
+                elif old["players"] != view["players"]:
+                    self._push("players", view)
+            self._servers = views
+            self._all = all_body
+            self._each = each
+            self._cond.notify_all()
+
+    def _push(self, name: str, view: Dict[str, Any]):
+        self._event_id += 1
+        self._events.append((self._event_id, name, json.dumps(view, separators=(',', ':'))))
+
+    def all(self) -> Optional[Tuple[bytes, str]]:
+        """(body, etag) for every server, or None before the first snapshot"""
+        with self._cond:
+            return self._all
+
+    def server(self, server_id: str) -> Optional[Tuple[bytes, str]]:
+        with self._cond:
+            return self._each.get(server_id)
+
+    def last_event_id(self) -> int:
+        with self._cond:
+            return self._event_id
+
+    def format_id(self, event_id: int) -> str:
+        return f"{self.epoch}-{event_id}"
+
+    def resume_from(self, last_event_id: str) -> int:
+        """
+        Where to resume a stream from a client's Last-Event-ID header.
+
+        IDs from another process or older than the history restart the stream
+        from now, since the events in between can't be replayed.
+        """
+        epoch, _, number = last_event_id.partition('-')
+        with self._cond:
+            if epoch != self.epoch or not number.isdigit():
+                return self._event_id
+            event_id = int(number)
+            oldest = self._events[0][0] if self._events else self._event_id + 1
+            if event_id > self._event_id or event_id < oldest - 1:
+                return self._event_id
+            return event_id
+
+    def events_since(self, event_id: int, timeout: float) -> List[Tuple[int, str, str]]:
+        """Events newer than event_id, waiting up to `timeout` seconds for one to arrive"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._event_id > event_id, timeout=timeout)
+            return [event for event in self._events if event[0] > event_id]
+
+
+status_feed = StatusFeed()
@@ -0,0 +1,213 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+DAY = 86400
+
+
+class Segment(NamedTuple):
+    """Voice time in one channel; `opens` is True for the first segment of a session"""
+    guild_id: int
+    member_id: int
+    channel_id: int
+    started: float
+    ended: float
+    opens: bool
+
+
+# (day, guild_id, member_id, channel_id) -> [seconds, sessions]
+Rollup = Dict[Tuple[str, int, int, int], List[float]]
+
+
+@lru_cache(maxsize=64)
+def _day_name(day_number: int) -> str:
+    return datetime.fromtimestamp(day_number * DAY, timezone.utc).strftime('%Y-%m-%d')
+
+
+def day_of(timestamp: float) -> str:
+    """UTC date of a timestamp, as YYYY-MM-DD"""
+    return _day_name(int(timestamp // DAY))
+
+
+def days_ago(days: int, now: Optional[float] = None) -> str:
+    """First day (UTC) of a window of `days` days ending today"""
+    now = time.time() if now is None else now
+    return day_of(now - (days - 1) * DAY)
+
+
+def rollup(segments: Iterable[Segment]) -> Rollup:
+    """Sum segments per UTC day, splitting those that cross midnight"""
+    totals: Rollup = defaultdict(lambda: [0.0, 0])
+    for segment in segments:
+        start, opens = segment.started, segment.opens
+        while start < segment.ended:
+            day_number = int(start // DAY)
+            end = min(segment.ended, (day_number + 1) * DAY)
+            entry = totals[(_day_name(day_number), segment.guild_id, segment.member_id, segment.channel_id)]
+            entry[0] += end - start
+            entry[1] += 1 if opens else 0
+            start, opens = end, False
+    return dict(totals)
+
+
+def merge(into: Rollup, other: Rollup):
+    for key, (seconds, sessions) in other.items():
+        entry = into.setdefault(key, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += sessions
+
+
+class VoiceTracker:
+    """
+    In-memory voice time accounting, fed from on_voice_state_update.
+
+    Open sessions are kept per member; closed time goes into a buffer that
+    the flush loop drains. Nothing here does I/O, so the event handler stays
+    cheap however busy voice gets.
+    """
+
+    def __init__(self):
+        self.open: Dict[int, Tuple[int, int, float, bool]] = {}  # member -> (guild, channel, since, opens)
+        self.buffer: List[Segment] = []
+
+    def update(self, guild_id: int, member_id: int, channel_id: Optional[int], now: Optional[float] = None):
+        """Record that a member is now in channel_id (None = not in a counted channel)"""
+        now = time.time() if now is None else now
+        current = self.open.get(member_id)
+        if current and current[:2] == (guild_id, channel_id):
+            return  # Mute, deafen, stream... same channel
+        if current:
+            self._close(member_id, now)
+        if channel_id is not None:
+            self.open[member_id] = (guild_id, channel_id, now, True)
+
+    def _close(self, member_id: int, now: float):
+        guild_id, channel_id, since, opens = self.open.pop(member_id)
+        if now > since:
+            self.buffer.append(Segment(guild_id, member_id, channel_id, since, now, opens))
+
+    def sync(self, present: Dict[int, Tuple[int, int]], now: Optional[float] = None):
+        """
+        Reconcile with who is actually in voice (member -> (guild, channel)),
+        e.g. after connecting, when updates may have been missed.
+        """
+        now = time.time() if now is None else now
+        for member_id in [m for m in self.open if m not in present]:
+            self._close(member_id, now)
+        for member_id, (guild_id, channel_id) in present.items():
+            self.update(guild_id, member_id, channel_id, now)
+
+    def drain(self, now: Optional[float] = None) -> List[Segment]:
+        """
+        Take the buffered time plus the time open sessions have run so far
+        (they carry on from `now`).
+        """
+        now = time.time() if now is None else now
+        for member_id, (guild_id, channel_id, since, opens) in list(self.open.items()):
+            if now > since:
+                self.buffer.append(Segment(guild_id, member_id, channel_id, since, now, opens))
+                self.open[member_id] = (guild_id, channel_id, now, False)
+        segments, self.buffer = self.buffer, []
+        return segments
+
+
+class VoiceStore:
+    """
+    Daily voice time rollups in SQLite.
+
+    Methods block; call them from a worker thread. One connection is shared
+    behind a lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS voice_daily (
+                    day TEXT NOT NULL,
+                    guild_id INTEGER NOT NULL,
+                    member_id INTEGER NOT NULL,
+                    channel_id INTEGER NOT NULL,
+                    seconds REAL NOT NULL DEFAULT 0,
+                    sessions INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, guild_id, member_id, channel_id)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS voice_daily_guild ON voice_daily (guild_id, day)")
+
+    def write(self, rows: Rollup):
+        """Add a batch of rollups in one transaction"""
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO voice_daily (day, guild_id, member_id, channel_id, seconds, sessions)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (day, guild_id, member_id, channel_id) DO UPDATE SET
+                    seconds = seconds + excluded.seconds,
+                    sessions = sessions + excluded.sessions
+                """,
+                [(*key, seconds, sessions) for key, (seconds, sessions) in rows.items()]
+            )
+
+    def _query(self, sql: str, params: Tuple) -> List[Tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def top_members(self, guild_id: int, since: str, limit: int = 10) -> List[Tuple[int, float]]:
+        """(member_id, seconds) with the most voice time since the given day"""
+        return self._query(
+            "SELECT member_id, SUM(seconds) AS total FROM voice_daily WHERE guild_id = ? AND day >= ? "
+            "GROUP BY member_id ORDER BY total DESC LIMIT ?",
+            (guild_id, since, limit)
+        )
+
+    def member_stats(self, guild_id: int, member_id: int, since: str) -> Dict[str, Any]:
+        """Totals, active days and favourite channels for one member since the given day"""
+        seconds, sessions, days = self._query(
+            "SELECT COALESCE(SUM(seconds), 0), COALESCE(SUM(sessions), 0), COUNT(DISTINCT day) "
+            "FROM voice_daily WHERE guild_id = ? AND member_id = ? AND day >= ?",
+            (guild_id, member_id, since)
+        )[0]
+        channels = self._query(
+            "SELECT channel_id, SUM(seconds) AS total FROM voice_daily "
+            "WHERE guild_id = ? AND member_id = ? AND day >= ? GROUP BY channel_id ORDER BY total DESC LIMIT 3",
+            (guild_id, member_id, since)
+        )
+        return {"seconds": seconds, "sessions": sessions, "days": days, "channels": channels}
+
+    def guild_stats(self, guild_id: int, since: str) -> Dict[str, Any]:
+        """Totals and busiest channels for the whole server since the given day"""
+        seconds, sessions, members = self._query(
+            "SELECT COALESCE(SUM(seconds), 0), COALESCE(SUM(sessions), 0), COUNT(DISTINCT member_id) "
+            "FROM voice_daily WHERE guild_id = ? AND day >= ?",
+            (guild_id, since)
+        )[0]
+        channels = self._query(
+            "SELECT channel_id, SUM(seconds) AS total FROM voice_daily WHERE guild_id = ? AND day >= ? "
+            "GROUP BY channel_id ORDER BY total DESC LIMIT 3",
+            (guild_id, since)
+        )
+        return {"seconds": seconds, "sessions": sessions, "members": members, "channels": channels}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def format_duration(seconds: float) -> str:
+    minutes = int(seconds // 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    return f"{minutes}m"
@@ -1,34 +1,124 @@
-from flask import Flask, jsonify
+import logging
 import threading
 
-app = Flask('')
+from utils.status_feed import status_feed
+
 bot_instance = None  # Store a reference to the bot
 
-@app.route('/')
-def home():
-    return "I'm alive!"
+# Browsers and bots may cache the server list this long; the bot polls Minefort once a minute
+API_CACHE_CONTROL = "public, max-age=30"
+SSE_KEEPALIVE = 15  # Seconds between comment lines on an idle event stream
+MAX_EVENT_STREAMS = 50  # Each open stream holds a server thread
+
+_event_streams = threading.BoundedSemaphore(MAX_EVENT_STREAMS)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header (a list of tags, or *) covers etag"""
+    if if_none_match.strip() == '*':
+        return True
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def create_app():
+    """Build the keep-alive Flask app (Flask is imported here to keep it off the startup path)"""
+    from flask import Flask, Response, jsonify, request
+
+    app = Flask('')
+
+    def cached_json(entry):
+        """Serve a pre-encoded body with ETag / If-None-Match handling"""
+        if entry is None:
+            return None
+        body, etag = entry
+        if etag_matches(request.headers.get('If-None-Match', ''), etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype='application/json')
+        response.headers['ETag'] = etag
+        response.headers['Cache-Control'] = API_CACHE_CONTROL
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        return response
+
+    @app.route('/')
+    def home():
+        return "I'm alive!"
+
+    @app.route('/health')
+    def health():
+        if bot_instance and hasattr(bot_instance, 'is_ready') and bot_instance.is_ready():
+            return jsonify({"status": "ok", "bot": "ready"}), 200
+        else:
+            return jsonify({"status": "degraded", "bot": "not ready"}), 503
+
+    @app.route('/api/servers')
+    def api_servers():
+        response = cached_json(status_feed.all())
+        if response is None:
+            return jsonify({"error": "No server data yet"}), 503
+        return response
+
+    @app.route('/api/servers/<server_id>')
+    def api_server(server_id):
+        if status_feed.all() is None:
+            return jsonify({"error": "No server data yet"}), 503
+        response = cached_json(status_feed.server(server_id))
+        if response is None:
+            return jsonify({"error": "Unknown server"}), 404
+        return response
+
+    @app.route('/api/events')
+    def api_events():
+        """Server-Sent Events: 'state' and 'players' events as servers change"""
+        if not _event_streams.acquire(blocking=False):
+            return jsonify({"error": "Too many open event streams"}), 503
+
+        last_id = status_feed.resume_from(request.headers.get('Last-Event-ID', ''))
+
+        def stream(last_id):
+            yield "retry: 5000\n\n"
+            while True:
+                events = status_feed.events_since(last_id, timeout=SSE_KEEPALIVE)
+                if not events:
+                    yield ": keepalive\n\n"
+                for event_id, name, data in events:
+                    last_id = event_id
+                    yield f"id: {status_feed.format_id(event_id)}\nevent: {name}\ndata: {data}\n\n"
+
+        response = Response(stream(last_id), mimetype='text/event-stream')
+        # Runs when the client disconnects, even if the stream never started
+        response.call_on_close(_event_streams.release)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        return response
+
+    @app.before_request
+    def skip_logging_for_health():
+        # Suppress logs for /health endpoint and HEAD requests (UptimeRobot uses HEAD)
+        if request.path == "/health":
+            # Werkzeug (Flask’s dev server) logs using 'werkzeug' logger
+            logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        else:
+            logging.getLogger('werkzeug').setLevel(logging.INFO)
+
+    return app
+
+
+def run():
+    create_app().run(host='0.0.0.0', port=8080)
 
-@app.route('/health')
-def health():
-    global bot_instance
-    if bot_instance and hasattr(bot_instance, 'is_ready') and bot_instance.is_ready():
-        return jsonify({"status": "ok", "bot": "ready"}), 200
-    else:
-        return jsonify({"status": "degraded", "bot": "not ready"}), 503
 
 def keep_alive(bot):
     global bot_instance
     bot_instance = bot
-    # Run Flask in a separate thread so it doesn't block the bot
-    thread = threading.Thread(target=lambda: app.run(host='0.0.0.0', port=8080))
+    # Run Flask in a separate thread so neither importing nor serving it blocks the bot
+    thread = threading.Thread(target=run)
     thread.daemon = True
     thread.start()
-
-@app.before_request
-def skip_logging_for_health():
-    # Suppress logs for /health endpoint and HEAD requests (UptimeRobot uses HEAD)
-    if request.path == "/health":
-        # Werkzeug (Flask’s dev server) logs using 'werkzeug' logger
-        logging.getLogger('werkzeug').setLevel(logging.ERROR)
-    else:
-        logging.getLogger('werkzeug').setLevel(logging.INFO)